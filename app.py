@@ -2,6 +2,7 @@ import dash
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 from flask_caching import Cache
+import plotly.io as pio
 import os
 from datetime import datetime, timedelta
 
@@ -24,8 +25,9 @@ app = dash.Dash(
 # Initialize server
 server = app.server
 
-# Setup cache directory
-CACHE_DIR = 'cache-directory'
+# Setup cache directory; the filesystem cache lives in shared memory when the
+# host has it, so lookups never touch the disk
+CACHE_DIR = '/dev/shm/retail-dashboard-cache' if os.path.isdir('/dev/shm') else 'cache-directory'
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
 
@@ -34,7 +36,7 @@ CACHE_CONFIG = {
     'CACHE_TYPE': 'filesystem',
     'CACHE_DIR': CACHE_DIR,
     'CACHE_DEFAULT_TIMEOUT': 300,  # 5 minutes default timeout
-    'CACHE_THRESHOLD': 500  # Maximum number of items the cache will store
+    'CACHE_THRESHOLD': 2000  # Maximum number of items the cache will store
 }
 
 # Initialize cache
@@ -44,6 +46,10 @@ cache.init_app(server, config=CACHE_CONFIG)
 # App title
 app.title = "Online Retail Dashboard"
 
+# Serialize figures (and Dash responses, which go through plotly's encoder) with
+# orjson; it encodes numpy and datetime64 arrays natively instead of via tolist()
+pio.json.config.default_engine = 'orjson'
+
 # Theme settings
 color_schemes = {
     'primary': '#2C3E50',    # Dark Blue
@@ -58,10 +64,10 @@ color_schemes = {
 }
 
 # Chart colors for consistency
-chart_colors = [
+chart_colors = (
     '#2C3E50', '#E74C3C', '#3498DB', '#2ECC71', '#F1C40F',
     '#9B59B6', '#34495E', '#16A085', '#27AE60', '#D35400'
-]
+)
 
 # Plot template
 plot_template = {
@@ -6,13 +6,14 @@ import pandas as pd
 import numpy as np
 from components.customer_charts import (
     create_customer_summary,
-    calculate_rfm_scores,
+    stored_rfm_scores,
     create_rfm_distribution_chart,
     create_lifecycle_chart,
     create_cohort_chart,
     create_segment_chart,
     create_customer_details_table
 )
+from data.frame_store import read_frame
 from datetime import datetime, timedelta
 
 @app.callback(
@@ -26,7 +27,7 @@ def update_customer_tab(active_tab, filtered_data):
     
     Args:
         active_tab: Currently active tab
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         
     Returns:
         Customer tab content if active, None otherwise
@@ -45,7 +46,7 @@ def update_rfm_distribution(filtered_data, selected_segments):
     Update RFM distribution chart based on selected segments
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         selected_segments: List of selected customer segments
         
     Returns:
@@ -53,11 +54,9 @@ def update_rfm_distribution(filtered_data, selected_segments):
     """
     if filtered_data is None:
         return None
-        
-    df = pd.read_json(filtered_data, orient='split')
     
-    # Calculate RFM scores and segments
-    rfm_df = calculate_rfm_scores(df)
+    # RFM scores and segments, shared with the other customer callbacks
+    rfm_df = stored_rfm_scores(filtered_data)
     
     # Filter for selected segments if any
     if selected_segments and len(selected_segments) > 0:
@@ -75,7 +74,7 @@ def update_customer_lifecycle(filtered_data, metric):
     Update customer lifecycle chart based on selected metric
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         metric: Selected metric ('orders', 'revenue', 'frequency')
         
     Returns:
@@ -84,7 +83,7 @@ def update_customer_lifecycle(filtered_data, metric):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Calculate customer age and metrics
     customer_metrics = df.groupby('CustomerID').agg({
@@ -108,7 +107,7 @@ def update_cohort_analysis(filtered_data, metric):
     Update customer cohort analysis chart
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         metric: Selected metric ('retention', 'revenue', 'frequency')
         
     Returns:
@@ -117,7 +116,7 @@ def update_cohort_analysis(filtered_data, metric):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Get customer's first purchase month
     customer_first_purchase = df.groupby('CustomerID')['InvoiceDate'].min().reset_index()
@@ -163,7 +162,7 @@ def update_customer_segments(filtered_data, metric):
     Update customer segmentation chart based on selected metric
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         metric: Selected metric for segmentation analysis
         
     Returns:
@@ -172,8 +171,8 @@ def update_customer_segments(filtered_data, metric):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
-    rfm_df = calculate_rfm_scores(df)
+    df = read_frame(filtered_data)
+    rfm_df = stored_rfm_scores(filtered_data)
     
     # Calculate segment metrics
     segment_metrics = df.merge(
@@ -198,7 +197,7 @@ def update_customer_details(filtered_data, selected_customer):
     Update detailed customer metrics table for selected customer
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         selected_customer: Selected customer ID
         
     Returns:
@@ -207,7 +206,7 @@ def update_customer_details(filtered_data, selected_customer):
     if filtered_data is None or not selected_customer:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Filter for selected customer
     customer_df = df[df['CustomerID'] == selected_customer]
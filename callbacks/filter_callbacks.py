@@ -2,7 +2,7 @@ from dash.dependencies import Input, Output, State
 from dash import callback_context
 import dash
 from app import app
-import pandas as pd
+from data.frame_store import make_frame_id, read_frame, write_frame
 from datetime import datetime, timedelta
 from utils.date_helpers import get_last_n_days, get_last_n_months, get_year_to_date
 
@@ -35,7 +35,7 @@ def update_filtered_data(start_date, end_date, countries, categories,
         current_data: Current data in the store
         
     Returns:
-        JSON string of filtered DataFrame
+        Store reference to the filtered DataFrame
     """
     ctx = callback_context
     if not ctx.triggered:
@@ -44,7 +44,7 @@ def update_filtered_data(start_date, end_date, countries, categories,
     triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
     
     # Load current data
-    df = pd.read_json(current_data, orient='split')
+    df = read_frame(current_data)
     
     # Handle quick date range buttons
     if triggered_id == 'last-30-days':
@@ -70,7 +70,7 @@ def update_filtered_data(start_date, end_date, countries, categories,
     
     filtered_df = df[mask]
     
-    return filtered_df.to_json(date_format='iso', orient='split')
+    return write_frame(filtered_df, make_frame_id(start_date, end_date, countries, categories))
 
 @app.callback(
     [Output('date-filter', 'start_date'),
@@ -100,7 +100,7 @@ def update_date_picker(last_30_days, last_quarter, ytd, all_time, current_data):
         return dash.no_update, dash.no_update
     
     triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    df = pd.read_json(current_data, orient='split')
+    df = read_frame(current_data)
     
     if triggered_id == 'last-30-days':
         start_date, end_date = get_last_n_days(30, df['InvoiceDate'].max())
@@ -126,7 +126,7 @@ def update_filter_options(filtered_data):
     Update filter dropdown options based on filtered data
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         
     Returns:
         Tuple of (country_options, category_options)
@@ -134,7 +134,7 @@ def update_filter_options(filtered_data):
     if filtered_data is None:
         return [], []
     
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Get unique countries
     countries = sorted(df['Country'].unique())
@@ -12,6 +12,7 @@ from components.product_charts import (
     create_category_performance_chart,
     create_product_details_table
 )
+from data.frame_store import read_frame
 from datetime import datetime, timedelta
 
 @app.callback(
@@ -25,7 +26,7 @@ def update_product_tab(active_tab, filtered_data):
     
     Args:
         active_tab: Currently active tab
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         
     Returns:
         Product tab content if active, None otherwise
@@ -45,7 +46,7 @@ def update_top_products(filtered_data, metric, top_n):
     Update top products chart based on selected metric and number of products
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         metric: Selected metric ('revenue', 'quantity', 'orders')
         top_n: Number of top products to display
         
@@ -55,7 +56,7 @@ def update_top_products(filtered_data, metric, top_n):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Aggregate product metrics
     product_metrics = df.groupby(['StockCode', 'Description']).agg({
@@ -86,7 +87,7 @@ def update_product_trends(filtered_data, selected_products, trend_type):
     Update product trends chart based on selected products and trend type
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         selected_products: List of selected product codes
         trend_type: Type of trend to display ('daily', 'weekly', 'monthly')
         
@@ -96,7 +97,7 @@ def update_product_trends(filtered_data, selected_products, trend_type):
     if filtered_data is None or not selected_products:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Filter for selected products
     df = df[df['StockCode'].isin(selected_products)]
@@ -126,7 +127,7 @@ def update_product_correlation(filtered_data, threshold):
     Update product correlation chart based on purchase patterns
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         threshold: Correlation threshold for displaying relationships
         
     Returns:
@@ -135,7 +136,7 @@ def update_product_correlation(filtered_data, threshold):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Create purchase matrix (which products are bought together)
     purchase_matrix = pd.crosstab(
@@ -171,7 +172,7 @@ def update_category_performance(filtered_data, metric):
     Update category performance chart based on selected metric
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         metric: Selected metric ('revenue', 'quantity', 'orders', 'customers')
         
     Returns:
@@ -180,7 +181,7 @@ def update_category_performance(filtered_data, metric):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Calculate category metrics
     category_metrics = df.groupby('Category').agg({
@@ -208,7 +209,7 @@ def update_product_details(filtered_data, selected_product):
     Update detailed product metrics table for selected product
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         selected_product: Selected product code
         
     Returns:
@@ -217,7 +218,7 @@ def update_product_details(filtered_data, selected_product):
     if filtered_data is None or not selected_product:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Filter for selected product
     product_df = df[df['StockCode'] == selected_product]
@@ -11,6 +11,7 @@ from components.sales_charts import (
     create_metrics_table
 )
 from components.kpi_cards import create_kpi_cards
+from data.frame_store import make_frame_id, read_frame, write_frame
 from datetime import datetime, timedelta
 
 @app.callback(
@@ -24,7 +25,7 @@ def update_sales_tab(active_tab, filtered_data):
     
     Args:
         active_tab: Currently active tab
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         
     Returns:
         Sales tab content if active, None otherwise
@@ -42,7 +43,7 @@ def update_kpi_cards(filtered_data):
     Update KPI cards with current period vs previous period comparison
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         
     Returns:
         Updated KPI cards component
@@ -51,7 +52,7 @@ def update_kpi_cards(filtered_data):
         return []
     
     # Get current period data
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Calculate date range for comparison
     date_range = (df['InvoiceDate'].max() - df['InvoiceDate'].min()).days
@@ -60,7 +61,7 @@ def update_kpi_cards(filtered_data):
     
     # Get previous period data
     prev_mask = (df['InvoiceDate'] >= start_date) & (df['InvoiceDate'] < end_date)
-    prev_data = df[prev_mask].to_json(date_format='iso', orient='split')
+    prev_data = write_frame(df[prev_mask], make_frame_id('previous', filtered_data['sid']))
     
     return create_kpi_cards(filtered_data, prev_data)
 
@@ -74,7 +75,7 @@ def update_sales_trend(filtered_data, interval):
     Update sales trend chart based on selected interval
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         interval: Selected time interval ('D', 'W', 'M')
         
     Returns:
@@ -83,24 +84,19 @@ def update_sales_trend(filtered_data, interval):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
-    # Group data by selected interval
+    # The daily view is built by the chart itself from the frame
     if interval == 'D':
-        grouped = df.groupby(df['InvoiceDate'].dt.date)
-    elif interval == 'W':
-        grouped = df.groupby(pd.Grouper(key='InvoiceDate', freq='W'))
-    else:  # Monthly
-        grouped = df.groupby(pd.Grouper(key='InvoiceDate', freq='M'))
-    
-    # Aggregate metrics
-    trend_data = grouped.agg({
-        'TotalAmount': 'sum',
-        'InvoiceNo': 'nunique',
-        'CustomerID': 'nunique'
-    }).reset_index()
-    
-    return create_sales_trend_chart(trend_data)
+        return create_sales_trend_chart(df)
+    
+    # Weekly/monthly: aggregate the plotted columns per period
+    trend_data = df.groupby(pd.Grouper(key='InvoiceDate', freq='W' if interval == 'W' else 'M')).agg(
+        Sales=('TotalAmount', 'sum'),
+        InvoiceNo=('InvoiceNo', 'nunique')
+    )
+    
+    return create_sales_trend_chart(daily_sales=trend_data)
 
 @app.callback(
     Output('sales-by-category-chart', 'children'),
@@ -112,7 +108,7 @@ def update_category_sales(filtered_data, metric):
     Update sales by category chart based on selected metric
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         metric: Selected metric ('revenue', 'orders', 'customers')
         
     Returns:
@@ -120,17 +116,9 @@ def update_category_sales(filtered_data, metric):
     """
     if filtered_data is None:
         return None
-        
-    df = pd.read_json(filtered_data, orient='split')
     
-    # Group by category and calculate metrics
-    category_metrics = df.groupby('Category').agg({
-        'TotalAmount': 'sum',
-        'InvoiceNo': 'nunique',
-        'CustomerID': 'nunique'
-    }).reset_index()
-    
-    return create_sales_by_category(category_metrics, metric)
+    # The chart aggregates revenue per category from the frame itself
+    return create_sales_by_category(read_frame(filtered_data))
 
 @app.callback(
     Output('hourly-sales-pattern', 'children'),
@@ -141,22 +129,16 @@ def update_hourly_pattern(filtered_data):
     Update hourly sales pattern chart
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         
     Returns:
         Updated hourly pattern chart
     """
     if filtered_data is None:
         return None
-        
-    df = pd.read_json(filtered_data, orient='split')
-    
-    # Create hour and day of week fields
-    hourly_pattern = df.groupby(['DayOfWeek', 'Hour']).agg({
-        'TotalAmount': 'sum'
-    }).reset_index()
     
-    return create_hourly_sales_pattern(hourly_pattern)
+    # The heatmap loads the stored frame and buckets day/hour itself
+    return create_hourly_sales_pattern(filtered_data)
 
 @app.callback(
     Output('sales-metrics-table', 'children'),
@@ -167,7 +149,7 @@ def update_sales_metrics(filtered_data):
     Update detailed sales metrics table
     
     Args:
-        filtered_data: JSON string of filtered DataFrame
+        filtered_data: Store reference to the filtered DataFrame
         
     Returns:
         Updated sales metrics table
@@ -175,7 +157,7 @@ def update_sales_metrics(filtered_data):
     if filtered_data is None:
         return None
         
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Calculate detailed metrics
     metrics = {
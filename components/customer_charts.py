@@ -5,6 +5,7 @@ from plotly.subplots import make_subplots
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 from app import cache, chart_colors, plot_template
+from data.frame_store import FrameRef, make_frame_id, read_frame, write_frame
 import numpy as np
 from datetime import datetime
 from typing import Dict, Any
@@ -117,7 +118,7 @@ def calculate_rfm_scores(df: pd.DataFrame) -> pd.DataFrame:
             ascending: Whether higher values should get higher scores
             
         Returns:
-            Series of integer scores from 1-5
+            Series of int8 scores from 1-5
         """
         # Handle null values
         if series.isna().any():
@@ -147,17 +148,16 @@ def calculate_rfm_scores(df: pd.DataFrame) -> pd.DataFrame:
             ]
             choices = [1, 2, 3, 4, 5]
         
-        return pd.Series(np.select(conditions, choices, default=3), index=series.index)
+        scores = np.select(conditions, np.array(choices, dtype=np.int8), default=np.int8(3))
+        return pd.Series(scores, index=series.index)
     
     # Calculate scores with proper handling of directionality
     rfm['R_Score'] = robust_scoring(rfm['Recency'], ascending=False)  # Lower recency is better
     rfm['F_Score'] = robust_scoring(rfm['Frequency'], ascending=True)  # Higher frequency is better
     rfm['M_Score'] = robust_scoring(rfm['Monetary'], ascending=True)   # Higher monetary is better
     
-    # Calculate RFM Score
-    rfm['RFM_Score'] = rfm['R_Score'].astype(str) + \
-                       rfm['F_Score'].astype(str) + \
-                       rfm['M_Score'].astype(str)
+    # Calculate RFM Score as the three digits packed into one int16 (R=5, F=4, M=3 -> 543)
+    rfm['RFM_Score'] = rfm['R_Score'].astype(np.int16) * 100 + rfm['F_Score'] * 10 + rfm['M_Score']
     
     # Segment customers (keep previous segmentation logic)
     def segment_customers(row):
@@ -185,6 +185,23 @@ def calculate_rfm_scores(df: pd.DataFrame) -> pd.DataFrame:
     
     return rfm
 
+@cache.memoize(timeout=300)
+def stored_rfm_scores(filtered_data: FrameRef) -> pd.DataFrame:
+    """
+    RFM scores of a stored frame, computed once per frame version
+    
+    The customer summary and the RFM and segment callbacks all score the same
+    filtered frame; the store reference carries a content hash, so it keys the
+    cache without hashing the frame again.
+    
+    Args:
+        filtered_data (FrameRef): Store reference to the filtered DataFrame
+        
+    Returns:
+        pd.DataFrame: Output of calculate_rfm_scores for the stored frame
+    """
+    return calculate_rfm_scores(read_frame(filtered_data))
+
 def create_rfm_distribution_chart(rfm_df: pd.DataFrame, customer_metrics: pd.DataFrame) -> dbc.Card:
     """
     Create comprehensive RFM distribution visualization
@@ -651,7 +668,6 @@ def get_segment_metrics(df: pd.DataFrame, rfm_data: pd.DataFrame) -> pd.DataFram
         'CustomerID': 'nunique',
         'Quantity': 'sum'
     }).reset_index()
-from io import StringIO
 
 def score_percentile(series: pd.Series) -> pd.Series:
     ranks = series.rank(pct=True)
@@ -663,12 +679,12 @@ def score_percentile(series: pd.Series) -> pd.Series:
     return scores
 
 @cache.memoize(timeout=300)
-def create_customer_summary(filtered_data: str) -> dbc.Container:
+def create_customer_summary(filtered_data: FrameRef) -> dbc.Container:
     """Create customer analysis dashboard"""
-    df = pd.read_json(StringIO(filtered_data), orient='split')
+    df = read_frame(filtered_data)
     df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
     
-    rfm_data = calculate_rfm_scores(df)
+    rfm_data = stored_rfm_scores(filtered_data)
     
     customer_metrics = df.groupby('CustomerID').agg({
         'InvoiceDate': lambda x: (x.max() - x.min()).days,
@@ -706,4 +722,4 @@ if __name__ == "__main__":
     df = loader.process_data()
     
     # Create the customer summary
-    customer_charts = create_customer_summary(df.to_json(date_format='iso', orient='split'))
\ No newline at end of file
+    customer_charts = create_customer_summary(write_frame(df, make_frame_id('example')))
\ No newline at end of file
@@ -4,15 +4,37 @@ import plotly.graph_objects as go
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 from app import cache, chart_colors, plot_template
+from data.frame_store import FrameRef, make_frame_id, read_frame, write_frame
 from typing import Optional
 
+# Static map layout, validated once at import rather than on every render
+_COUNTRY_MAP_LAYOUT = go.Figure().update_layout(
+    title='Sales Distribution by Country',
+    template=plot_template,
+    geo=dict(
+        showframe=False,
+        showcoastlines=True,
+        projection_type='equirectangular'
+    ),
+    margin=dict(l=0, r=0, t=40, b=0),
+    height=500
+).to_plotly_json()['layout']
+
+_COUNTRY_MAP_HOVER = ('<b>%{text}</b><br>' +
+                      'Sales: £%{z:,.2f}<br>' +
+                      'Total Orders: %{customdata[0]}<br>' +
+                      'Total Customers: %{customdata[1]}')
+
 def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     Process the dataframe to ensure all required columns are present and properly formatted
     """
     try:
         # Replace missing country names with 'Others'
-        df['Country'] = df['Country'].fillna('Others')
+        country = df['Country']
+        if isinstance(country.dtype, pd.CategoricalDtype) and 'Others' not in country.cat.categories:
+            country = country.cat.add_categories('Others')
+        df['Country'] = country.fillna('Others')
         
         # Create MonthYear if it doesn't exist
         if 'MonthYear' not in df.columns and 'InvoiceDate' in df.columns:
@@ -29,49 +51,34 @@ def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     except Exception as e:
         raise ValueError(f"Error processing dataframe: {str(e)}")
 
-def create_country_sales_map(filtered_data: str) -> dbc.Card:
+def create_country_sales_map(filtered_data: FrameRef) -> dbc.Card:
     try:
-        df = pd.read_json(filtered_data, orient='split')
+        df = read_frame(filtered_data)
         df = process_dataframe(df)
 
         # Aggregate sales by country
-        country_sales = df.groupby('Country').agg({
+        country_sales = df.groupby('Country', observed=True).agg({
             'Sales': 'sum',
             'InvoiceNo': 'nunique',
             'CustomerID': 'nunique'
         }).reset_index()
 
-        # Create the choropleth map
-        fig = go.Figure(go.Choropleth(
-            locations=country_sales['Country'],
-            z=country_sales['Sales'],
-            locationmode='country names',
-            colorscale='Viridis',
-            text=country_sales['Country'],  # Add country names as text
-            hovertemplate='<b>%{text}</b><br>' +
-                          'Sales: £%{z:,.2f}<br>' +
-                          'Total Orders: %{customdata[0]}<br>' +
-                          'Total Customers: %{customdata[1]}',
-            customdata=country_sales[['InvoiceNo', 'CustomerID']].values,
-            colorbar_title='Sales (£)'
-        ))
-
-        # Update layout
-        fig.update_layout(
-            title='Sales Distribution by Country',
-            template=plot_template,
-            geo=dict(
-                showframe=False,
-                showcoastlines=True,
-                projection_type='equirectangular'
-            ),
-            margin=dict(l=0, r=0, t=40, b=0),
-            height=500
-        )
+        # Create the choropleth map as a plain trace dict on the prebuilt layout
+        trace = {
+            'type': 'choropleth',
+            'locations': country_sales['Country'].values,
+            'z': country_sales['Sales'].values,
+            'locationmode': 'country names',
+            'colorscale': 'Viridis',
+            'text': country_sales['Country'].values,  # Add country names as text
+            'hovertemplate': _COUNTRY_MAP_HOVER,
+            'customdata': country_sales[['InvoiceNo', 'CustomerID']].values,
+            'colorbar': {'title': {'text': 'Sales (£)'}}
+        }
 
         return dbc.Card(
             dbc.CardBody([
-                dcc.Graph(figure=fig)
+                dcc.Graph(figure={'data': [trace], 'layout': _COUNTRY_MAP_LAYOUT})
             ])
         )
     except Exception as e:
@@ -82,20 +89,19 @@ def create_country_sales_map(filtered_data: str) -> dbc.Card:
             ])
         )
 
-def create_country_performance_chart(filtered_data: str) -> dbc.Card:
+def create_country_performance_chart(filtered_data: FrameRef) -> dbc.Card:
     """
     Create a detailed country performance analysis with improved percentage formatting
     """
     try:
-        df = pd.read_json(filtered_data, orient='split')
+        df = read_frame(filtered_data)
         df = process_dataframe(df)
         
         # Calculate metrics by country
-        country_metrics = df.groupby('Country').agg({
+        country_metrics = df.groupby('Country', observed=True).agg({
             'Sales': 'sum',
             'InvoiceNo': 'nunique',
-            'CustomerID': 'nunique',
-            'Quantity': 'sum'
+            'CustomerID': 'nunique'
         }).reset_index()
         
         # Calculate percentage of total sales and average order value
@@ -186,22 +192,24 @@ def create_country_performance_chart(filtered_data: str) -> dbc.Card:
             ])
         )
         
-def create_regional_time_analysis(filtered_data: str) -> dbc.Card:
+def create_regional_time_analysis(filtered_data: FrameRef) -> dbc.Card:
     """
     Create time-based analysis by region with improved visibility
     """
     try:
-        # Parse the JSON data
-        df = pd.read_json(filtered_data, orient='split')
+        # Load the stored frame
+        df = read_frame(filtered_data)
         df = process_dataframe(df)
         
         if 'MonthYear' not in df.columns:
             raise ValueError("MonthYear column not found and could not be created from available data")
         
         # Aggregate monthly sales by country
-        regional_time = df.groupby(['Country', 'MonthYear']).agg({
+        regional_time = df.groupby(['Country', 'MonthYear'], observed=True).agg({
             'Sales': 'sum'
         }).reset_index()
+        # Plain labels on the small aggregate, so the line chart only sees countries present
+        regional_time['Country'] = regional_time['Country'].astype(str)
         
         # Sort by MonthYear to ensure proper timeline
         regional_time['MonthYear'] = pd.to_datetime(regional_time['MonthYear'].astype(str))
@@ -209,7 +217,7 @@ def create_regional_time_analysis(filtered_data: str) -> dbc.Card:
         regional_time['MonthYear'] = regional_time['MonthYear'].dt.strftime('%Y-%m')
         
         # Identify top countries by total sales to focus on
-        top_countries = df.groupby('Country')['Sales'].sum().nlargest(5).index.tolist()
+        top_countries = df.groupby('Country', observed=True)['Sales'].sum().nlargest(5).index.tolist()
         regional_time_top = regional_time[regional_time['Country'].isin(top_countries)]
         
         # Create line chart
@@ -265,7 +273,7 @@ def create_regional_time_analysis(filtered_data: str) -> dbc.Card:
         )
 
 @cache.memoize(timeout=300)
-def create_geographic_summary(filtered_data: str) -> dbc.Container:
+def create_geographic_summary(filtered_data: FrameRef) -> dbc.Container:
     """
     Create a container with all geography-related charts
     """
@@ -310,4 +318,4 @@ if __name__ == "__main__":
     df = loader.process_data()
     
     # Create the geographic summary
-    geographic_charts = create_geographic_summary(df.to_json(date_format='iso', orient='split'))
\ No newline at end of file
+    geographic_charts = create_geographic_summary(write_frame(df, make_frame_id('example')))
\ No newline at end of file
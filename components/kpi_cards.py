@@ -1,9 +1,9 @@
-import pandas as pd
 from dash import html
 import dash_bootstrap_components as dbc
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
 from app import cache, kpi_card_style
+from data.frame_store import FrameRef, make_frame_id, read_frame, write_frame
 
 def format_currency(value: float) -> str:
     """Format value as currency"""
@@ -74,11 +74,11 @@ def create_kpi_card(title: str, value: str, trend: float, icon_class: str) -> db
     )
 
 @cache.memoize(timeout=300)  # Cache for 5 minutes
-def calculate_kpi_metrics(current_data: str, previous_data: str = None) -> Dict[str, Any]:
+def calculate_kpi_metrics(current_data: FrameRef, previous_data: Optional[FrameRef] = None) -> Dict[str, Any]:
     """Calculate KPI metrics from current and previous period data"""
-    # Parse JSON data
-    df_current = pd.read_json(current_data, orient='split')
-    df_previous = pd.read_json(previous_data, orient='split') if previous_data else None
+    # Load the stored frames
+    df_current = read_frame(current_data)
+    df_previous = read_frame(previous_data) if previous_data else None
     
     # Calculate current period metrics
     current_metrics = {
@@ -110,7 +110,7 @@ def calculate_kpi_metrics(current_data: str, previous_data: str = None) -> Dict[
         'trends': trends
     }
 
-def create_kpi_cards(current_data: str, previous_data: str = None) -> dbc.Row:
+def create_kpi_cards(current_data: FrameRef, previous_data: Optional[FrameRef] = None) -> dbc.Row:
     """Create all KPI cards with data"""
     # Get metrics and trends
     kpi_data = calculate_kpi_metrics(current_data, previous_data)
@@ -172,4 +172,4 @@ if __name__ == "__main__":
     df = loader.process_data()
     
     # Create the KPI cards
-    kpi_cards = create_kpi_cards(df.to_json(date_format='iso', orient='split'))
\ No newline at end of file
+    kpi_cards = create_kpi_cards(write_frame(df, make_frame_id('example')))
\ No newline at end of file
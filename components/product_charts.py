@@ -6,6 +6,7 @@ from dash import html, dcc
 from datetime import datetime
 import dash_bootstrap_components as dbc
 from app import cache, chart_colors, plot_template
+from data.frame_store import FrameRef, make_frame_id, read_frame, write_frame
 import numpy as np
 import multiprocessing
 from joblib import Parallel, delayed
@@ -17,17 +18,16 @@ import io
 import base64
 
 
-def create_top_products_chart(filtered_data: str) -> dbc.Card:
+def create_top_products_chart(filtered_data: FrameRef) -> dbc.Card:
     """
     Create a chart showing top products by revenue and quantity
     """
-    df = pd.read_json(filtered_data, orient='split')
+    df = read_frame(filtered_data)
     
     # Aggregate product data
-    product_metrics = df.groupby(['StockCode', 'Description']).agg({
+    product_metrics = df.groupby(['StockCode', 'Description'], observed=True, sort=False).agg({
         'TotalAmount': 'sum',
-        'Quantity': 'sum',
-        'InvoiceNo': 'nunique'
+        'Quantity': 'sum'
     }).reset_index()
     
     # Get top 10 products by revenue
@@ -96,13 +96,13 @@ def create_top_products_chart(filtered_data: str) -> dbc.Card:
         ])
     )
 
-def create_product_trends_chart(filtered_data: str) -> dbc.Card:
+def create_product_trends_chart(filtered_data: FrameRef) -> dbc.Card:
     """
     Create a chart showing overall product sales trends over time
     """
     try:
         # Read the JSON data
-        df = pd.read_json(filtered_data, orient='split')
+        df = read_frame(filtered_data)
         
         # Convert InvoiceDate to datetime
         df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
@@ -227,25 +227,33 @@ def compute_product_correlations(purchase_matrix_chunk):
         print(f"Error in correlation computation: {e}")
         return pd.DataFrame()
 
-def create_product_correlation_chart(filtered_data: str) -> dbc.Card:
+def create_product_correlation_chart(filtered_data: FrameRef) -> dbc.Card:
     """
     Create a chart showing product correlations based on purchase patterns
     with parallel processing for improved performance
     
     Args:
-        filtered_data (str): JSON-formatted purchase data
+        filtered_data (FrameRef): Store reference to the filtered purchase data
     
     Returns:
         dbc.Card: Plotly visualization of product correlations
     """
     try:
         # Load the data
-        df = pd.read_json(filtered_data, orient='split')
+        df = read_frame(filtered_data)
         
-        # Prepare purchase matrix
-        # Group by InvoiceNo and Description, then pivot to create binary purchase matrix
-        purchase_matrix = df.groupby(['InvoiceNo', 'Description']).size().unstack(fill_value=0)
-        purchase_matrix = (purchase_matrix > 0).astype(int)
+        # Prepare binary purchase matrix (invoice x product) straight from factor
+        # codes; uint8 cells take an eighth of the memory of pivoted int64 counts
+        keys = df[['InvoiceNo', 'Description']].dropna()
+        invoice_codes, invoices = pd.factorize(keys['InvoiceNo'], sort=True)
+        product_codes, products = pd.factorize(keys['Description'], sort=True)
+        purchases = np.zeros((len(invoices), len(products)), dtype=np.uint8)
+        purchases[invoice_codes, product_codes] = 1
+        purchase_matrix = pd.DataFrame(
+            purchases,
+            index=pd.Index(invoices, name='InvoiceNo'),
+            columns=pd.Index(products, name='Description')
+        )
         
         # Parallel correlation computation
         num_cores = multiprocessing.cpu_count()
@@ -562,12 +570,12 @@ def create_product_details_table(metrics: Dict[str, Any]) -> dbc.Card:
     )
 
 @cache.memoize(timeout=300)
-def create_product_summary(filtered_data: str) -> dbc.Container:
+def create_product_summary(filtered_data: FrameRef) -> dbc.Container:
     """
     Create a container with all product-related charts
     
     Args:
-        filtered_data (str): JSON string of filtered DataFrame
+        filtered_data (FrameRef): Store reference to the filtered DataFrame
         
     Returns:
         dbc.Container: Container with product analysis charts
@@ -617,4 +625,4 @@ if __name__ == "__main__":
     df = loader.process_data()
     
     # Create the product summary
-    product_charts = create_product_summary(df.to_json(date_format='iso', orient='split'))
\ No newline at end of file
+    product_charts = create_product_summary(write_frame(df, make_frame_id('example')))
\ No newline at end of file
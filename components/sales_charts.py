@@ -1,15 +1,197 @@
+import os
+from functools import lru_cache
 import pandas as pd
+import numpy as np
+import dask
+import dask.dataframe as dd
 import plotly.express as px
 import plotly.graph_objects as go
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from app import cache, chart_colors, plot_template
+from config.settings import KPI_FORMAT_FN
+from data.frame_store import FrameRef, make_frame_id, read_frame, write_frame
+from utils.grouping import grouped_nunique
 import logging
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Trend series longer than this are downsampled before being sent to the client
+LTTB_THRESHOLD = 1000
+LTTB_TARGET_POINTS = 500
+
+# Filtered frames larger than this are aggregated in parallel through Dask
+DASK_ROW_THRESHOLD = 2_000_000
+
+# Static trace styling and layouts, built once at import. Layouts go through
+# Plotly's validators here (expanding templates and shorthand like
+# xaxis_title) so each chart can assemble its figure as a plain dict.
+_SALES_COLOR = '#1E90FF'
+_ORDERS_COLOR = '#FF6347'
+_SALES_LINE = dict(color=_SALES_COLOR, width=2)
+_ORDERS_LINE = dict(color=_ORDERS_COLOR, width=2)
+_SALES_HOVER = 'Date: %{x}<br>Sales: £%{y:,.2f}<extra></extra>'
+_ORDERS_HOVER = 'Date: %{x}<br>Orders: %{y:,.0f}<extra></extra>'
+_CATEGORY_HOVER = '%{y}<br>Sales: £%{x:,.2f}<extra></extra>'
+
+_TREND_LAYOUT = go.Layout(
+    title='Daily Sales Trend',
+    template='plotly_white',
+    hovermode='x unified',
+    yaxis=dict(
+        title='Sales (£)',
+        titlefont=dict(color=_SALES_COLOR),
+        tickfont=dict(color=_SALES_COLOR)
+    ),
+    yaxis2=dict(
+        title='Number of Orders',
+        titlefont=dict(color=_ORDERS_COLOR),
+        tickfont=dict(color=_ORDERS_COLOR),
+        anchor='x',
+        overlaying='y',
+        side='right'
+    ),
+    showlegend=True,
+    legend=dict(
+        orientation='h',
+        yanchor='bottom',
+        y=1.02,
+        xanchor='right',
+        x=1
+    ),
+    margin=dict(l=60, r=60, t=80, b=60)
+).to_plotly_json()
+
+# Applied as an update so plot_template is merged over the default template
+_CATEGORY_LAYOUT = go.Figure().update_layout(
+    title='Top 10 Product Categories by Sales',
+    template=plot_template,
+    xaxis_title='Sales (£)',
+    showlegend=False,
+    margin=dict(l=160, r=40, t=80, b=60),
+    height=400
+).to_plotly_json()['layout']
+
+_DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+_HOURS = np.arange(24)
+_HOURLY_HOVER = 'Day: %{y}<br>Hour: %{x}:00<br>Revenue: £%{z:,.2f}<extra></extra>'
+
+_HOURLY_LAYOUT = go.Layout(
+    title=dict(text='Sales by Day and Hour', x=0.5, xanchor='center'),
+    template=plot_template,
+    xaxis_title='Hour of Day',
+    yaxis_title='Day of Week',
+    xaxis=dict(
+        tickmode='array',
+        ticktext=[f'{h:02d}:00' for h in range(24)],
+        tickvals=list(range(24))
+    ),
+    margin=dict(l=120, r=40, t=80, b=60),
+    height=400
+).to_plotly_json()
+
+def _figure_graph(data: List[Dict[str, Any]], layout: Dict[str, Any], **graph_kwargs) -> dcc.Graph:
+    """
+    Wrap plain trace dicts and a pre-validated layout in a dcc.Graph
+
+    No go.Figure is built, so Plotly's per-property validation never runs on
+    the request path, and memoized component trees hold plain JSON-ready dicts.
+    """
+    return dcc.Graph(figure={'data': data, 'layout': layout}, **graph_kwargs)
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Select n_out point indices with Largest-Triangle-Three-Buckets so the
+    downsampled series keeps the visual shape of the original
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and next bucket mean
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+
+    return indices
+
+def _downsample_series(series: pd.Series) -> pd.Series:
+    """Downsample a date-indexed series with LTTB when it exceeds LTTB_THRESHOLD"""
+    if len(series) <= LTTB_THRESHOLD:
+        return series
+    idx = _lttb_indices(
+        series.index.values.astype('int64'),
+        series.to_numpy(),
+        LTTB_TARGET_POINTS
+    )
+    return series.iloc[idx]
+
+def _aggregate_with_dask(df: pd.DataFrame, raw_df: pd.DataFrame, top_n: int = 10) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Compute the daily and category aggregates for the sales charts in a single
+    threaded Dask graph so the groupbys run across all cores
+    
+    The results match _daily_sales and _category_sales in index, columns and dtypes.
+    
+    Args:
+        df (pd.DataFrame): Cleaned frame used for the daily trend
+        raw_df (pd.DataFrame): Unmodified filtered frame used for categories
+        top_n (int): Number of categories to keep
+        
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Daily sales indexed by day and
+            category sales indexed by category, largest first
+    """
+    npartitions = os.cpu_count() or 1
+    category_field = 'Category' if 'Category' in raw_df.columns else 'Description'
+    
+    # Keep object columns as they are; Dask would otherwise convert every text
+    # column to pyarrow strings and label the categories with that dtype
+    with dask.config.set({'dataframe.convert-string': False}):
+        daily = dd.from_pandas(
+            df.assign(InvoiceDate=df['InvoiceDate'].dt.normalize()),
+            npartitions=npartitions
+        ).groupby('InvoiceDate')
+        category = dd.from_pandas(raw_df, npartitions=npartitions).groupby(category_field)
+    
+    sales, orders, category_totals = dask.compute(
+        daily['TotalAmount'].sum(),
+        daily['InvoiceNo'].nunique(),
+        category['TotalAmount'].sum(),
+        scheduler='threads'
+    )
+    
+    # Same unnamed, day-resolution index and float32 sales as _daily_sales
+    sales = sales.sort_index()
+    daily_sales = pd.DataFrame({
+        'Sales': sales.to_numpy().astype(np.float32),
+        'InvoiceNo': orders.reindex(sales.index).to_numpy()
+    }, index=pd.DatetimeIndex(sales.index.to_numpy().astype('datetime64[D]')))
+    category_sales = category_totals.rename_axis(None).nlargest(top_n).to_frame()
+    
+    return daily_sales, category_sales
+
 # def create_sales_trend_chart(filtered_data: str) -> dbc.Card:
 #     """
 #     Create a sales trend chart showing daily, weekly, and monthly trends
@@ -92,163 +274,187 @@ logger = logging.getLogger(__name__)
 #             ])
 #         )
 
-def create_sales_trend_chart(filtered_data: str) -> dbc.Card:
+def _daily_sales(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clean the filtered frame and aggregate daily sales and order counts
+    
+    Args:
+        df (pd.DataFrame): Filtered DataFrame, already loaded from the store
+        
+    Returns:
+        pd.DataFrame: 'Sales' and 'InvoiceNo' columns indexed by day
+    """
+    # Data cleaning steps
+    # 1. Keep rows with a CustomerID (and a date, which every day bucket needs);
+    #    masking only the three arrays used avoids dropna copying the whole frame
+    keep = (df['CustomerID'].notna() & df['InvoiceDate'].notna()).to_numpy()
+    if not keep.any():
+        return pd.DataFrame({'Sales': [], 'InvoiceNo': []}, index=pd.DatetimeIndex([]))
+    
+    # 2-3. Sales from absolute quantities in one NumPy expression over the raw
+    #      arrays, without writing Quantity or Sales columns back to the frame
+    sales = np.multiply(np.abs(df['Quantity'].to_numpy()[keep]), df['UnitPrice'].to_numpy()[keep])
+    
+    # 4. Truncate InvoiceDate (already datetime64 in the store) to whole days
+    #    and turn them into dense codes by subtracting the first day, which is
+    #    plain int64 arithmetic rather than a hash-based factorize
+    day_numbers = df['InvoiceDate'].to_numpy()[keep].astype('datetime64[D]').astype(np.int64)
+    first_day = day_numbers.min()
+    day_codes = day_numbers - first_day
+    n_days = int(day_codes.max()) + 1
+    
+    # Daily sum, row count and distinct-order count are bincounts over the
+    # day codes (only the plotted columns are aggregated)
+    rows = np.bincount(day_codes, minlength=n_days)
+    sales = np.bincount(day_codes, weights=sales, minlength=n_days)
+    orders = grouped_nunique(day_codes, df['InvoiceNo'].to_numpy()[keep], n_days)
+    
+    # Drop days without any sales rows, as a groupby would
+    present = rows > 0
+    days = (np.flatnonzero(present) + first_day).astype('datetime64[D]')
+    return pd.DataFrame({
+        'Sales': sales[present].astype(np.float32),
+        'InvoiceNo': orders[present]
+    }, index=pd.DatetimeIndex(days))
+
+def _category_sales(df: pd.DataFrame, top_n: int = 10) -> pd.DataFrame:
+    """
+    Aggregate sales per product category, falling back to Description, and
+    keep only the best-selling categories
+    
+    Args:
+        df (pd.DataFrame): Filtered DataFrame, already loaded from the store
+        top_n (int): Number of categories to keep
+        
+    Returns:
+        pd.DataFrame: 'TotalAmount' column indexed by category, largest first
+    """
+    # If Category exists, use it, otherwise fall back to Description
+    group_by_field = 'Category' if 'Category' in df.columns else 'Description'
+    
+    # Sum sales over int codes of the (possibly thousands of) category strings;
+    # only TotalAmount is plotted, so nothing else is aggregated
+    codes, categories = pd.factorize(df[group_by_field])
+    valid = codes >= 0
+    totals = np.bincount(
+        codes[valid], weights=df['TotalAmount'].to_numpy()[valid], minlength=len(categories)
+    )
+    
+    # Trim to the top categories here so only they are cached and plotted
+    return pd.Series(totals, index=categories, name='TotalAmount').nlargest(top_n).to_frame()
+
+@cache.memoize(timeout=300)
+def _aggregate_sales(filtered_data: FrameRef) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load the stored frame and compute the daily and category aggregates once
+    
+    Only the small aggregated frames are cached, keyed by the store reference
+    (filter id and content hash), so revisiting a filter skips the O(N)
+    cleaning and grouping without caching the full frame.
+    
+    Args:
+        filtered_data (FrameRef): Store reference to the filtered DataFrame
+        
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Daily sales and category sales frames
+    """
+    raw_df = read_frame(filtered_data)
+    
+    # Large selections are aggregated once in parallel through Dask
+    if len(raw_df) > DASK_ROW_THRESHOLD:
+        df = raw_df.dropna(subset=['CustomerID'])
+        df = df.assign(TotalAmount=np.multiply(np.abs(df['Quantity'].to_numpy()), df['UnitPrice'].to_numpy()))
+        return _aggregate_with_dask(df, raw_df)
+    
+    return _daily_sales(raw_df), _category_sales(raw_df)
+
+def create_sales_trend_chart(df: Optional[pd.DataFrame] = None, daily_sales: Optional[pd.DataFrame] = None) -> dbc.Card:
     """
     Create a sales trend chart showing daily, weekly, and monthly trends
     with data cleaning for negative quantities and missing customer IDs
+    
+    Args:
+        df (pd.DataFrame, optional): Filtered DataFrame; required unless daily_sales is given
+        daily_sales (pd.DataFrame, optional): Pre-aggregated daily sales indexed
+            by day; skips cleaning and aggregating df when provided
     """
     try:
-        # Load the data
-        df = pd.read_json(filtered_data, orient='split')
-        
-        # Data cleaning steps
-        # 1. Remove rows with missing CustomerID
-        df = df.dropna(subset=['CustomerID'])
-        
-        # 2. Convert negative Quantity to positive
-        df['Quantity'] = df['Quantity'].abs()
-        
-        # 3. Calculate Sales (renamed from Revenue)
-        df['Sales'] = df['Quantity'] * df['UnitPrice']
-        
-        # 4. Ensure InvoiceDate is datetime
-        df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'], format='ISO8601').dt.date
-        
-        # Aggregate daily sales
-        daily_sales = df.groupby('InvoiceDate').agg({
-            'Sales': 'sum',
-            'InvoiceNo': 'nunique',
-            'CustomerID': 'nunique'
-        }).reset_index()
-        
-        # Create the figure
-        fig = go.Figure()
-        
-        # Add sales line
-        fig.add_trace(
-            go.Scatter(
-                x=daily_sales['InvoiceDate'],
-                y=daily_sales['Sales'],
-                name='Sales',
-                line=dict(color='#1E90FF', width=2),
-                hovertemplate='Date: %{x}<br>Sales: £%{y:,.2f}<extra></extra>'
-            )
-        )
-        
-        # Add order count line
-        fig.add_trace(
-            go.Scatter(
-                x=daily_sales['InvoiceDate'],
-                y=daily_sales['InvoiceNo'],
-                name='Orders',
-                line=dict(color='#FF6347', width=2),
-                yaxis='y2',
-                hovertemplate='Date: %{x}<br>Orders: %{y:,.0f}<extra></extra>'
-            )
-        )
-        
-        # Update layout
-        fig.update_layout(
-            title='Daily Sales Trend',
-            template='plotly_white',
-            hovermode='x unified',
-            yaxis=dict(
-                title='Sales (£)',
-                titlefont=dict(color='#1E90FF'),
-                tickfont=dict(color='#1E90FF')
-            ),
-            yaxis2=dict(
-                title='Number of Orders',
-                titlefont=dict(color='#FF6347'),
-                tickfont=dict(color='#FF6347'),
-                anchor='x',
-                overlaying='y',
-                side='right'
-            ),
-            showlegend=True,
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=1.02,
-                xanchor='right',
-                x=1
-            ),
-            margin=dict(l=60, r=60, t=80, b=60)
-        )
+        if daily_sales is None:
+            daily_sales = _daily_sales(df)
+        
+        # Downsample long ranges; each trace keeps its own extrema
+        sales = _downsample_series(daily_sales['Sales'])
+        orders = _downsample_series(daily_sales['InvoiceNo'])
+        
+        # Sales line and order count line on a secondary axis
+        traces = [
+            {
+                'type': 'scattergl',
+                'x': sales.index.values,
+                'y': sales.values,
+                'name': 'Sales',
+                'line': _SALES_LINE,
+                'hovertemplate': _SALES_HOVER
+            },
+            {
+                'type': 'scattergl',
+                'x': orders.index.values,
+                'y': orders.values,
+                'name': 'Orders',
+                'line': _ORDERS_LINE,
+                'yaxis': 'y2',
+                'hovertemplate': _ORDERS_HOVER
+            }
+        ]
         
         return dbc.Card(
             dbc.CardBody([
-                dcc.Graph(figure=fig, style={'height': '400px'})
+                _figure_graph(traces, _TREND_LAYOUT, style={'height': '400px'})
             ])
         )
     except Exception as e:
-        logging.error(f"Error creating sales trend chart: {str(e)}")
+        logger.error("Error creating sales trend chart: %s", e)
         return dbc.Card(
             dbc.CardBody([
                 html.P("Error creating sales Trend", className="text-danger text-center")
             ])
         )
 
-def create_sales_by_category(filtered_data: str) -> dbc.Card:
+def create_sales_by_category(df: Optional[pd.DataFrame] = None, category_sales: Optional[pd.DataFrame] = None) -> dbc.Card:
     """
     Create a chart showing sales distribution by product category or description group
+    
+    Args:
+        df (pd.DataFrame, optional): Filtered DataFrame; required unless category_sales is given
+        category_sales (pd.DataFrame, optional): Pre-aggregated sales indexed by
+            category; skips aggregating df when provided
     """
     try:
-        df = pd.read_json(filtered_data, orient='split')
-        
-        # If Category exists, use it
-        if 'Category' in df.columns:
-            group_by_field = 'Category'
-        else:
-            # Create a simplified category based on the first word of Description
-            df['Category'] = df['Description']
-            group_by_field = 'Category'
+        if category_sales is None:
+            category_sales = _category_sales(df)
         
-        # Group by category
-        category_sales = df.groupby(group_by_field).agg({
-            'TotalAmount': 'sum',
-            'InvoiceNo': 'nunique'
-        }).reset_index()
-        
-        # Sort by total amount
-        category_sales = category_sales.sort_values('TotalAmount', ascending=True)
-        
-        # Take top 10 categories
+        # Take top 10 categories; nlargest already returns them in descending order
         category_sales = category_sales.nlargest(10, 'TotalAmount')
         
-        # Create horizontal bar chart
-        fig = go.Figure()
-        
-        # Add revenue bars
-        fig.add_trace(
-            go.Bar(
-                y=category_sales[group_by_field],
-                x=category_sales['TotalAmount'],
-                name='Revenue',
-                orientation='h',
-                marker_color=chart_colors[0],
-                hovertemplate='%{y}<br>Sales: £%{x:,.2f}<extra></extra>'
-            )
-        )
-        
-        # Update layout
-        fig.update_layout(
-            title='Top 10 Product Categories by Sales',
-            template=plot_template,
-            xaxis_title='Sales (£)',
-            showlegend=False,
-            margin=dict(l=160, r=40, t=80, b=60),
-            height=400
-        )
+        # Horizontal revenue bars
+        traces = [{
+            'type': 'bar',
+            'y': category_sales.index.values,
+            'x': category_sales['TotalAmount'].values,
+            'name': 'Revenue',
+            'orientation': 'h',
+            'marker': {'color': chart_colors[0]},
+            'hovertemplate': _CATEGORY_HOVER
+        }]
         
         return dbc.Card(
             dbc.CardBody([
-                dcc.Graph(figure=fig)
+                _figure_graph(traces, _CATEGORY_LAYOUT)
             ])
         )
         
     except Exception as e:
-        logger.error(f"Error creating sales by category chart: {str(e)}")
+        logger.error("Error creating sales by category chart: %s", e)
         return dbc.Card(
             dbc.CardBody([
                 html.P("Unable to create category analysis chart", 
@@ -256,177 +462,81 @@ def create_sales_by_category(filtered_data: str) -> dbc.Card:
             ])
         )
 
-# def create_hourly_sales_pattern(filtered_data: str) -> dbc.Card:
-#     """
-#     Create a heatmap showing hourly sales patterns by day of week
-#     """
-#     try:
-#         df = pd.read_json(filtered_data, orient='split')
-        
-#         # Add DayOfWeek and Hour fields
-#         df['DayOfWeek'] = df['InvoiceDate'].dt.day_name()
-#         df['Hour'] = df['InvoiceDate'].dt.hour
-        
-#         # Group by DayOfWeek and Hour
-#         hourly_pattern = df.groupby(['DayOfWeek', 'Hour']).agg({
-#             'TotalAmount': 'sum'
-#         }).reset_index()
-        
-#         # Ensure proper day of week order
-#         day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-#         hourly_pattern['DayOfWeek'] = pd.Categorical(hourly_pattern['DayOfWeek'], 
-#                                                    categories=day_order, 
-#                                                    ordered=True)
-        
-#         # Pivot data for heatmap
-#         pivot_data = hourly_pattern.pivot(
-#             index='DayOfWeek',
-#             columns='Hour',
-#             values='TotalAmount'
-#         )
-        
-#         # Create heatmap
-#         fig = go.Figure(data=go.Heatmap(
-#             z=pivot_data.values,
-#             x=pivot_data.columns,
-#             y=pivot_data.index,
-#             colorscale='Blues',
-#             hoverongaps=False,
-#             hovertemplate='Day: %{y}<br>Hour: %{x}:00<br>Revenue: £%{z:,.2f}<extra></extra>'
-#         ))
-        
-#         # Update layout
-#         fig.update_layout(
-#             title='Hourly Sales Pattern',
-#             template=plot_template,
-#             xaxis_title='Hour of Day',
-#             yaxis_title='Day of Week',
-#             margin=dict(l=120, r=40, t=80, b=60)
-#         )
-        
-#         return dbc.Card(
-#             dbc.CardBody([
-#                 dcc.Graph(figure=fig)
-#             ])
-#         )
-#     except Exception as e:
-#         logger.error(f"Error creating hourly sales pattern: {str(e)}")
-#         return dbc.Card(
-#             dbc.CardBody([
-#                 html.P("Error creating hourly sales pattern", className="text-danger text-center")
-#             ])
-#         )
+def _hourly_soa(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extract day of week, hour of day and revenue as flat NumPy arrays
+
+    Day and hour come straight from the datetime64 values (1970-01-01 was a
+    Thursday) so no pandas .dt accessors or intermediate columns are built.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: int8 day of week (Monday=0),
+            int8 hour and float32 TotalAmount
+    """
+    hours = df['InvoiceDate'].values.astype('datetime64[h]').astype(np.int64)
+    dow = ((hours // 24 + 3) % 7).astype(np.int8)
+    hour = (hours % 24).astype(np.int8)
+    return dow, hour, df['TotalAmount'].to_numpy(dtype=np.float32)
+
+def _hourly_matrix(dow: np.ndarray, hour: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """Scatter-sum revenue into a (7, 24) day-by-hour matrix"""
+    cells = dow.astype(np.intp) * 24 + hour
+    return np.bincount(cells, weights=total, minlength=7 * 24).reshape(7, 24).astype(np.float32)
+
+def create_hourly_sales_pattern(filtered_data: FrameRef) -> dbc.Card:
+    """
+    Create a heatmap showing hourly sales patterns by day of week
+    """
+    try:
+        df = read_frame(filtered_data)
+        matrix = _hourly_matrix(*_hourly_soa(df))
+
+        traces = [{
+            'type': 'heatmap',
+            'z': matrix,
+            'x': _HOURS,
+            'y': _DAY_ORDER,
+            'colorscale': 'Blues',
+            'hoverongaps': False,
+            'hovertemplate': _HOURLY_HOVER
+        }]
+
+        return dbc.Card([
+            dbc.CardHeader("Hourly Sales Pattern"),
+            dbc.CardBody([
+                _figure_graph(traces, _HOURLY_LAYOUT, config={'displayModeBar': True})
+            ])
+        ])
+    except Exception as e:
+        logger.error("Error creating hourly sales pattern: %s", e)
+        return dbc.Card(
+            dbc.CardBody([
+                html.P("Error creating hourly sales pattern", className="text-danger text-center")
+            ])
+        )
+
+@lru_cache(maxsize=None)
+def _metric_display(metric: str) -> Tuple[str, Callable[[Any], str]]:
+    """
+    Resolve the row label and value formatter for a metric key once
+
+    Keys outside KPI_CONFIGS keep the previous rule: currency when the key
+    mentions revenue, two decimals otherwise.
+    """
+    format_value = KPI_FORMAT_FN.get(metric)
+    if format_value is None:
+        format_value = ('£{:,.2f}' if 'revenue' in metric.lower() else '{:,.2f}').format
+    return metric.replace('_', ' ').title(), format_value
 
-# def create_hourly_sales_pattern(filtered_data: str) -> dbc.Card:
-#     """
-#     Create a heatmap showing hourly sales patterns by day of week
-#     """
-#     try:
-#         # Load the data and properly parse dates
-#         df = pd.read_json(filtered_data, orient='split')
-        
-#         # Convert InvoiceDate to datetime explicitly
-#         df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'], format='ISO8601')
-        
-#         # Extract day of week and hour
-#         df['DayOfWeek'] = df['InvoiceDate'].dt.strftime('%A')  # Full day name
-#         df['Hour'] = df['InvoiceDate'].dt.hour
-        
-#         # Define day order
-#         day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        
-#         # Group by DayOfWeek and Hour, calculating total amount
-#         hourly_pattern = df.groupby(['DayOfWeek', 'Hour'])['TotalAmount'].sum().reset_index()
-        
-#         # Convert DayOfWeek to categorical with proper order
-#         hourly_pattern['DayOfWeek'] = pd.Categorical(
-#             hourly_pattern['DayOfWeek'],
-#             categories=day_order,
-#             ordered=True
-#         )
-        
-#         # Sort by the categorical order
-#         hourly_pattern = hourly_pattern.sort_values('DayOfWeek')
-        
-#         # Create pivot table for heatmap
-#         pivot_table = hourly_pattern.pivot(
-#             index='DayOfWeek',
-#             columns='Hour',
-#             values='TotalAmount'
-#         )
-        
-#         # Fill any missing hours with 0
-#         pivot_table = pivot_table.fillna(0)
-        
-#         # Create heatmap
-#         fig = go.Figure(data=go.Heatmap(
-#             z=pivot_table.values,
-#             x=pivot_table.columns,
-#             y=day_order,
-#             colorscale='Blues',
-#             hoverongaps=False,
-#             hovertemplate=(
-#                 'Day: %{y}<br>' +
-#                 'Hour: %{x}:00<br>' +
-#                 'Revenue: £%{z:,.2f}' +
-#                 '<extra></extra>'
-#             )
-#         ))
-        
-#         # Update layout
-#         fig.update_layout(
-#             title={
-#                 'text': 'Sales by Day and Hour',
-#                 'x': 0.5,
-#                 'xanchor': 'center'
-#             },
-#             template=plot_template,
-#             xaxis_title='Hour of Day',
-#             yaxis_title='Day of Week',
-#             xaxis=dict(
-#                 tickmode='array',
-#                 ticktext=[f'{h:02d}:00' for h in range(24)],
-#                 tickvals=list(range(24))
-#             ),
-#             margin=dict(l=120, r=40, t=80, b=60),
-#             height=400
-#         )
-        
-#         return dbc.Card([
-#             dbc.CardHeader("Hourly Sales Pattern"),
-#             dbc.CardBody([
-#                 dcc.Graph(
-#                     figure=fig,
-#                     config={'displayModeBar': True}
-#                 )
-#             ])
-#         ])
-        
-#     except Exception as e:
-#         import traceback
-#         error_msg = f"Error creating hourly sales pattern: {str(e)}\n{traceback.format_exc()}"
-#         print(error_msg)
-        
-#         return dbc.Card([
-#             dbc.CardHeader("Hourly Sales Pattern"),
-#             dbc.CardBody([
-#                 dbc.Alert(
-#                     [
-#                         html.H4("Error Creating Chart", className="alert-heading"),
-#                         html.P("An error occurred while creating the hourly sales pattern chart."),
-#                         html.Hr(),
-#                         html.P(str(e), className="mb-0")
-#                     ],
-#                     color="danger"
-#                 )
-#             ])
-#         ])
-        
 def create_metrics_table(metrics: Dict[str, Any]) -> dbc.Table:
     """
     Create a table displaying sales metrics
     """
     try:
+        rows = []
+        for metric, value in metrics.items():
+            label, format_value = _metric_display(metric)
+            rows.append(html.Tr([html.Td(label), html.Td(format_value(value))]))
         return dbc.Table([
             html.Thead([
                 html.Tr([
@@ -434,43 +544,32 @@ def create_metrics_table(metrics: Dict[str, Any]) -> dbc.Table:
                     html.Th('Value')
                 ])
             ]),
-            html.Tbody([
-                html.Tr([
-                    html.Td(metric.replace('_', ' ').title()),
-                    html.Td(f'£{value:,.2f}' if 'revenue' in metric.lower() else f'{value:,.2f}')
-                ]) for metric, value in metrics.items()
-            ])
+            html.Tbody(rows)
         ], bordered=True, hover=True, responsive=True)
     except Exception as e:
-        logger.error(f"Error creating metrics table: {str(e)}")
+        logger.error("Error creating metrics table: %s", e)
         return html.P("Error creating metrics table", className="text-danger")
 
 @cache.memoize(timeout=300)
-def create_sales_summary(filtered_data: str) -> dbc.Container:
+def create_sales_summary(filtered_data: FrameRef) -> dbc.Container:
     """
     Create a container with all sales-related charts
+
+    The stored frame is aggregated once and the results handed to each chart builder
     """
     try:
-        # Load and validate data
-        df = pd.read_json(filtered_data, orient='split')
-        df = df.dropna(subset=['CustomerID'])
-    
-        # Convert negative Quantity to positive
-        df['Quantity'] = df['Quantity'].abs()
-        df['TotalAmount'] = df['Quantity'] * df['UnitPrice']
-        
-        # Ensure datetime conversion
-        df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'], format='ISO8601')
+        # Aggregate once (cached per store reference) and hand the results to each chart
+        daily_sales, category_sales = _aggregate_sales(filtered_data)
         
         return dbc.Container([
             dbc.Row([
                 dbc.Col([
-                    create_sales_trend_chart(filtered_data)
+                    create_sales_trend_chart(daily_sales=daily_sales)
                 ], md=12, className="mb-4")
             ]),
             dbc.Row([
                 dbc.Col([
-                    create_sales_by_category(filtered_data)
+                    create_sales_by_category(category_sales=category_sales)
                 ], md=12, className="mb-4"),
                 # dbc.Col([
                 #     create_hourly_sales_pattern(filtered_data)
@@ -478,7 +577,7 @@ def create_sales_summary(filtered_data: str) -> dbc.Container:
             ])
         ], fluid=True)
     except Exception as e:
-        print(f"Error creating sales summary: {str(e)}")
+        logger.exception("Error creating sales summary")
         return dbc.Container([
             dbc.Alert(
                 [
@@ -507,9 +606,9 @@ if __name__ == "__main__":
         
         if df is not None:
             # Create the sales summary
-            sales_charts = create_sales_summary(df.to_json(date_format='iso', orient='split'))
+            sales_charts = create_sales_summary(write_frame(df, make_frame_id('example')))
             print("Sales charts created successfully")
     except Exception as e:
-        logger.error(f"Error in test run: {str(e)}")
+        logger.error("Error in test run: %s", e)
 
 
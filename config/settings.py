@@ -1,5 +1,8 @@
 import os
+import re
+from itertools import chain
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Any
 from datetime import datetime
 
@@ -18,8 +21,8 @@ ASSETS_DIR = BASE_DIR / "assets"
 CACHE_DIR = BASE_DIR / "cache-directory"
 
 # Ensure directories exist
-for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, ASSETS_DIR, CACHE_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+for directory in (DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, ASSETS_DIR, CACHE_DIR):
+    os.makedirs(directory, exist_ok=True)
 
 # Data Settings
 DEFAULT_EXCEL_FILE = "Online Retail.xlsx"
@@ -228,6 +231,23 @@ ERROR_MESSAGES = {
     'filter': "Error applying filters. Please try different filter combinations."
 }
 
+def _freeze(value: Any) -> Any:
+    """Recursively wrap dicts in read-only proxies and turn lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Read-only lookups shared across callbacks
+THEME = _freeze(THEME)
+KPI_CONFIGS = _freeze(KPI_CONFIGS)
+
+# Bound formatters per KPI key, e.g. KPI_FORMAT_FN['revenue'](1234.5) -> '£1,234.50'
+KPI_FORMAT_FN: MappingProxyType = MappingProxyType(
+    {key: config['format'].format for key, config in KPI_CONFIGS.items()}
+)
+
 # Function to get environment-specific settings
 def get_env_settings() -> Dict[str, Any]:
     """Get environment-specific settings"""
@@ -248,25 +268,29 @@ def get_env_settings() -> Dict[str, Any]:
             'SECRET_KEY': 'dev-secret-key'
         }
 
+# Hex color such as '#2C3E50' or '#fff'
+_is_hex_color = re.compile(r'^#[0-9A-Fa-f]{3,8}$').match
+
 # Function to validate settings
 def validate_settings() -> bool:
     """Validate critical settings and paths"""
     try:
         # Check required directories
-        for directory in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, ASSETS_DIR]:
-            if not directory.exists():
-                raise ValueError(f"Required directory not found: {directory}")
+        missing = next((d for d in (DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, ASSETS_DIR)
+                        if not os.path.isdir(d)), None)
+        if missing is not None:
+            raise ValueError(f"Required directory not found: {missing}")
 
         # Check data file
         data_file = RAW_DATA_DIR / DEFAULT_EXCEL_FILE
-        if not data_file.exists():
+        if not os.path.isfile(data_file):
             raise ValueError(f"Data file not found: {data_file}")
 
-        # Validate color schemes
-        for color_set in [THEME['colors'], THEME['chart_colors']]:
-            for color in color_set:
-                if not isinstance(color, str) or not color.startswith('#'):
-                    raise ValueError(f"Invalid color format: {color}")
+        # Validate color schemes (theme color values and the chart palette)
+        bad_color = next((c for c in chain(THEME['colors'].values(), THEME['chart_colors'])
+                          if not isinstance(c, str) or not _is_hex_color(c)), None)
+        if bad_color is not None:
+            raise ValueError(f"Invalid color format: {bad_color}")
 
         return True
 
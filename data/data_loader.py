@@ -3,33 +3,95 @@ import numpy as np
 import dask.dataframe as dd
 import pyarrow as pa
 import pyarrow.parquet as pq
+from openpyxl import load_workbook
+from functools import lru_cache
 from pathlib import Path
 import logging
 from typing import Dict, List, Tuple, Optional, Any
 from datetime import datetime, timedelta
 import os
+import importlib.util
+
+from utils.date_helpers import get_date_parts
+from utils.grouping import count_distinct
 
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Parquet schema metadata key holding the source workbook's mtime
+_SOURCE_STAMP_KEY = b'source_mtime_ns'
+
+# Bump when the cached columns or dtypes change so older caches are rebuilt
+_CACHE_FORMAT = b'4'
+
+# Rows per parquet row group; with the cache sorted by InvoiceDate each group
+# covers a narrow date range, so date filters can skip most groups unread
+CACHE_ROW_GROUP_SIZE = 65536
+
+# Arrow types for the workbook columns while streaming it; numbers are read as
+# float64 and integral columns are narrowed once all rows are in
+EXCEL_COLUMN_TYPES = {
+    'InvoiceNo': pa.string(),
+    'StockCode': pa.string(),
+    'Description': pa.string(),
+    'Quantity': pa.float64(),
+    'InvoiceDate': pa.timestamp('ns'),
+    'UnitPrice': pa.float64(),
+    'CustomerID': pa.float64(),
+    'Country': pa.string()
+}
+
+def _excel_text(value: Any) -> Optional[str]:
+    """Render a cell as text the way pandas would show it (536365.0 -> '536365')"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+# DataFrame libraries RetailDataLoader can return frames from
+DATA_BACKENDS = ('pandas', 'cudf')
+
+# Repetitive text columns stored as categoricals (int codes plus one copy of each label)
+CATEGORICAL_COLUMNS = ['InvoiceNo', 'StockCode', 'Country', 'Description']
+
+@lru_cache(maxsize=4)
+def _read_parquet_cached(path: str, mtime_ns: int) -> pd.DataFrame:
+    """
+    Read a whole parquet cache once per process
+    
+    Keyed by the file's mtime, so a rewritten cache is read afresh while every
+    loader instance in the process shares one decoded frame.
+    """
+    return pq.read_table(path).to_pandas(self_destruct=True, split_blocks=True)
+
 class RetailDataLoader:
     """
     Optimized data loader for retail dashboard with caching and efficient data processing
     """
     
-    def __init__(self, file_path: str, cache_dir: str = 'data/processed'):
+    def __init__(self, file_path: str, cache_dir: str = 'data/processed', backend: str = 'pandas'):
         """
         Initialize the data loader with file paths and configurations
         
         Args:
             file_path (str): Path to the Excel file
             cache_dir (str): Directory for storing processed data
+            backend (str): 'pandas' (default) or 'cudf' to return GPU DataFrames;
+                falls back to pandas when cudf is not installed
         """
+        if backend not in DATA_BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}; expected one of {DATA_BACKENDS}")
+        if backend == 'cudf' and importlib.util.find_spec('cudf') is None:
+            logger.warning("cudf is not installed; falling back to the pandas backend")
+            backend = 'pandas'
+        
         self.file_path = Path(file_path)
         self.cache_dir = Path(cache_dir)
         self.parquet_path = self.cache_dir / 'retail_data.parquet'
+        self.backend = backend
         self.processed_data = None
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
@@ -89,29 +151,197 @@ class RetailDataLoader:
     #     except Exception as e:
     #         logger.error(f"Error loading data: {str(e)}")
     #         return None 
-    # Modify load_data method in RetailDataLoader class
-    def load_data(self) -> pd.DataFrame:
-        """Load and process data from Excel file"""
+    def _source_stamp(self) -> Optional[bytes]:
+        """Cache format and source workbook mtime, used to tag the parquet cache"""
+        try:
+            return _CACHE_FORMAT + b':' + str(os.stat(self.file_path).st_mtime_ns).encode()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store text ID columns as categoricals and CustomerID as nullable Int32
+        
+        Groupby, nunique and isin then work on integer codes instead of Python strings
+        
+        Args:
+            df (pd.DataFrame): Cleaned DataFrame
+            
+        Returns:
+            pd.DataFrame: DataFrame with compact dtypes
+        """
+        columns = [col for col in CATEGORICAL_COLUMNS if col in df.columns]
+        df[columns] = df[columns].astype('category')
+        df['CustomerID'] = pd.to_numeric(df['CustomerID'], errors='coerce').astype('Int32')
+        return df
+
+    def _load_cached(self, columns: Optional[List[str]] = None,
+                     filters: Optional[List[Tuple[str, str, Any]]] = None) -> Optional[pd.DataFrame]:
+        """
+        Load the parquet cache if it was built from the current source workbook
+        
+        Args:
+            columns (List[str], optional): Columns to read; all columns when omitted
+            filters (List[Tuple], optional): Row predicates pushed down to the parquet
+                reader; predicates on columns the cache lacks are ignored
+            
+        Returns:
+            Optional[pd.DataFrame]: Cached DataFrame, or None if missing or stale
+        """
+        try:
+            schema = pq.read_schema(self.parquet_path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return None
+        metadata = schema.metadata or {}
+        
+        # A cache written by another pipeline, in an older format or from an
+        # older workbook is rebuilt
+        stamp = self._source_stamp()
+        cached_stamp = metadata.get(_SOURCE_STAMP_KEY, b'')
+        if not cached_stamp.startswith(_CACHE_FORMAT + b':') or (stamp is not None and cached_stamp != stamp):
+            return None
+        
+        logger.info(f"Loading cached data from {self.parquet_path}")
+        # Read through pyarrow directly; the column projection is pushed down to
+        # the parquet reader and the Arrow buffers are released as they convert
+        if filters:
+            filters = [f for f in filters if f[0] in schema.names] or None
+        if self.backend == 'cudf':
+            # Optional GPU dependency, imported only when requested; the column
+            # projection and predicates are pushed down to the GPU parquet reader
+            import cudf
+            return cudf.read_parquet(self.parquet_path, columns=columns, filters=filters)
+        if columns is None and filters is None:
+            # Full reads come from the process-wide cache; the shallow copy lets
+            # callers add or replace columns without touching the shared frame
+            mtime_ns = os.stat(self.parquet_path).st_mtime_ns
+            return _read_parquet_cached(str(self.parquet_path), mtime_ns).copy(deep=False)
+        table = pq.read_table(self.parquet_path, columns=columns, filters=filters)
+        return table.to_pandas(self_destruct=True, split_blocks=True)
+
+    def _cached_columns(self) -> List[str]:
+        """Column names stored in the parquet cache, or an empty list without one"""
+        try:
+            return pq.read_schema(self.parquet_path).names
+        except (FileNotFoundError, pa.ArrowInvalid):
+            return []
+
+    def _write_cache(self, df: pd.DataFrame) -> None:
+        """Persist the cleaned data to parquet, tagged with the source workbook's mtime"""
         try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                _SOURCE_STAMP_KEY: self._source_stamp() or _CACHE_FORMAT + b':'
+            })
+            
+            # Write to a private file and rename so a concurrent reader never sees a partial cache
+            tmp_path = self.parquet_path.with_name(f'{self.parquet_path.name}.{os.getpid()}.tmp')
+            pq.write_table(table, tmp_path, compression='snappy', row_group_size=CACHE_ROW_GROUP_SIZE)
+            os.replace(tmp_path, self.parquet_path)
+        except Exception as e:
+            logger.error(f"Error writing parquet cache: {str(e)}")
+
+    def read_excel(self) -> pd.DataFrame:
+        """
+        Stream the workbook into Arrow record batches of chunk_size rows
+        
+        Only one chunk of rows is held as Python objects at a time; everything
+        read so far is kept as typed Arrow columns. Falls back to pd.read_excel
+        if a column does not fit its expected type.
+        
+        Returns:
+            pd.DataFrame: Raw workbook contents
+        """
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True, keep_links=False)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [str(name) for name in next(rows)]
+            types = [EXCEL_COLUMN_TYPES.get(name) for name in header]
+            
+            def to_batch(chunk: List[tuple]) -> pa.RecordBatch:
+                arrays = []
+                for i, arrow_type in enumerate(types):
+                    values = [row[i] if i < len(row) else None for row in chunk]
+                    if arrow_type == pa.string():
+                        values = [_excel_text(v) for v in values]
+                    arrays.append(pa.array(values, type=arrow_type))
+                return pa.RecordBatch.from_arrays(arrays, names=header)
+            
+            batches, chunk = [], []
+            for row in rows:
+                # Skip blank rows, as read_excel does for trailing ones
+                if all(v is None for v in row):
+                    continue
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    batches.append(to_batch(chunk))
+                    chunk = []
+            if chunk:
+                batches.append(to_batch(chunk))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            logger.warning(f"Streaming read failed ({str(e)}); falling back to pd.read_excel")
+            return pd.read_excel(self.file_path, parse_dates=['InvoiceDate'])
+        finally:
+            workbook.close()
+        
+        df = pa.Table.from_batches(batches).to_pandas(self_destruct=True, split_blocks=True)
+        
+        # Whole-number columns come back as int64, as read_excel returns them
+        for col in ('Quantity',):
+            if col in df.columns and df[col].notna().all() and (df[col] % 1 == 0).all():
+                df[col] = df[col].astype(np.int64)
+        return df
+
+    def load_data(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load processed data, reading the Excel file only when the parquet cache is stale
+        
+        Args:
+            columns (List[str], optional): Subset of columns the caller needs; a
+                subset is returned without replacing processed_data
+            
+        Returns:
+            pd.DataFrame: Processed DataFrame, empty if loading fails
+        """
+        try:
+            df = self._load_cached(columns)
+            if df is not None:
+                if columns is None:
+                    self.processed_data = df
+                logger.info(f"Data loaded successfully: {len(df)} rows")
+                return df
+            
             logger.info(f"Loading data from {self.file_path}")
-            df = pd.read_excel(self.file_path, parse_dates=['InvoiceDate'])
+            df = self.read_excel()
             
             # Basic cleaning
             df = df.dropna(subset=['InvoiceNo', 'Quantity', 'UnitPrice'])
             df = df[df['Quantity'] > 0]
             
+            # Excel mixes int and letter-prefixed codes; keep them as plain strings
+            df['InvoiceNo'] = df['InvoiceNo'].astype(str)
+            df['StockCode'] = df['StockCode'].astype(str)
+            
             # Calculate total amount
             df['TotalAmount'] = df['Quantity'] * df['UnitPrice']
             
             # Add date features
-            df['Year'] = df['InvoiceDate'].dt.year
-            df['Month'] = df['InvoiceDate'].dt.month
-            df['DayOfWeek'] = df['InvoiceDate'].dt.dayofweek
-            df['Hour'] = df['InvoiceDate'].dt.hour
+            date_parts = get_date_parts(df['InvoiceDate'])
+            for part in ('Year', 'Month', 'DayOfWeek', 'Hour'):
+                df[part] = date_parts[part]
             
+            # Sort chronologically so each cached row group spans a narrow date range
+            df = df.sort_values('InvoiceDate', kind='stable', ignore_index=True)
+            df = self._compact_dtypes(df)
+            self._write_cache(df)
+            if self.backend == 'cudf':
+                import cudf
+                df = cudf.from_pandas(df)
             self.processed_data = df
             logger.info(f"Data loaded successfully: {len(df)} rows")
-            return df
+            return df if columns is None else df[columns]
             
         except Exception as e:
             logger.error(f"Error loading data: {str(e)}")
@@ -132,23 +362,29 @@ class RetailDataLoader:
             
             # Basic cleaning
             df = df.dropna(subset=['InvoiceNo', 'Quantity', 'UnitPrice'])
-            df = df[~df['InvoiceNo'].astype(str).str.startswith('C')]
+            
+            # Drop cancellations ('C'-prefixed invoices); the prefix is checked once
+            # per distinct invoice and mapped back to rows through the factor codes
+            invoice_codes, invoices = pd.factorize(df['InvoiceNo'])
+            cancelled = np.asarray(invoices.astype(str).str.startswith('C'), dtype=bool)
+            df = df[~cancelled[invoice_codes]]
             df = df[(df['Quantity'] > 0) & (df['UnitPrice'] > 0)]
             
             # Data type conversions
             df['InvoiceNo'] = df['InvoiceNo'].astype(str)
             df['StockCode'] = df['StockCode'].astype(str)
-            df['CustomerID'] = pd.to_numeric(df['CustomerID'], errors='coerce')
+            
+            # Downcast numerics; halving the bytes speeds up every later groupby scan
+            df = df.astype({'Quantity': 'int32', 'UnitPrice': 'float32'})
+            df = self._compact_dtypes(df)
             
             # Calculate total amount
             df['TotalAmount'] = df['Quantity'] * df['UnitPrice']
             
             # Add date features
-            df['Year'] = df['InvoiceDate'].dt.year
-            df['Month'] = df['InvoiceDate'].dt.month
-            df['Day'] = df['InvoiceDate'].dt.day
-            df['DayOfWeek'] = df['InvoiceDate'].dt.dayofweek
-            df['Hour'] = df['InvoiceDate'].dt.hour
+            date_parts = get_date_parts(df['InvoiceDate'])
+            for part in ('Year', 'Month', 'Day', 'DayOfWeek', 'Hour'):
+                df[part] = date_parts[part]
             
             # Save to parquet for future use
             logger.info("Saving processed data to parquet...")
@@ -177,12 +413,26 @@ class RetailDataLoader:
         """
         try:
             if self.processed_data is None:
+                # Nothing in memory yet: push the filters down to the parquet cache
+                # so only the matching row groups are read
+                filters = [('InvoiceDate', '>=', pd.Timestamp(start_date)),
+                           ('InvoiceDate', '<=', pd.Timestamp(end_date))]
+                if countries:
+                    filters.append(('Country', 'in', list(countries)))
+                if categories:
+                    filters.append(('Category', 'in', list(categories)))
+                
+                df = self._load_cached(filters=filters)
+                if df is not None:
+                    return df
+                
                 self.processed_data = self.load_data()
                 
             if self.processed_data is None:
                 return pd.DataFrame()
             
-            df = self.processed_data.copy()
+            # Mask the shared frame directly; df[mask] already returns a new frame
+            df = self.processed_data
             
             # Apply filters
             mask = (df['InvoiceDate'] >= start_date) & (df['InvoiceDate'] <= end_date)
@@ -210,13 +460,21 @@ class RetailDataLoader:
             List[Any]: List of unique values
         """
         try:
-            if self.processed_data is None:
-                self.processed_data = self.load_data()
+            df = self.processed_data
+            if df is None:
+                # A valid cache can answer for one column without loading the rest
+                df = self._load_cached(columns=[column]) if column in self._cached_columns() else None
+            if df is None:
+                self.processed_data = df = self.load_data()
                 
-            if self.processed_data is None or column not in self.processed_data.columns:
+            if df is None or column not in df.columns:
                 return []
                 
-            return sorted(self.processed_data[column].unique().tolist())
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Categories are already the deduplicated labels; no row scan needed
+                return sorted(values.cat.categories.tolist())
+            return sorted(values.unique().tolist())
             
         except Exception as e:
             logger.error(f"Error getting unique values for {column}: {str(e)}")
@@ -239,15 +497,20 @@ class RetailDataLoader:
             if df is None or df.empty:
                 return {}
                 
+            # Each total is computed once and reused for the derived average
+            total_revenue = df['TotalAmount'].sum()
+            total_orders = count_distinct(df['InvoiceNo'])
+            dates = df['InvoiceDate']
+            
             metrics = {
-                'total_revenue': df['TotalAmount'].sum(),
-                'total_orders': df['InvoiceNo'].nunique(),
-                'total_customers': df['CustomerID'].nunique(),
-                'avg_order_value': df['TotalAmount'].sum() / df['InvoiceNo'].nunique(),
-                'total_products': df['StockCode'].nunique(),
+                'total_revenue': total_revenue,
+                'total_orders': total_orders,
+                'total_customers': count_distinct(df['CustomerID']),
+                'avg_order_value': total_revenue / total_orders,
+                'total_products': count_distinct(df['StockCode']),
                 'time_range': {
-                    'start': df['InvoiceDate'].min(),
-                    'end': df['InvoiceDate'].max()
+                    'start': dates.min(),
+                    'end': dates.max()
                 }
             }
             
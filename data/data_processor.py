@@ -4,11 +4,65 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import logging
 from pathlib import Path
+from scipy.sparse import csr_matrix, triu as sparse_triu
+
+from utils.date_helpers import get_date_parts
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Weekday labels in dayofweek order (Monday=0), matching Series.dt.day_name()
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def _invoice_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute per-invoice totals in one pass and broadcast them back to the rows
+    
+    InvoiceNo is factorized once and every statistic is a bincount over those
+    codes, instead of a separate groupby-transform (and hash of InvoiceNo) each.
+    Rows without an InvoiceNo get NaN, as groupby-transform gives them.
+    
+    Args:
+        df (pd.DataFrame): Transactions with Quantity, UnitPrice, StockCode and TransactionValue
+        
+    Returns:
+        pd.DataFrame: ItemCount, UniqueItems, AvgItemPrice and InvoiceTotal per row,
+            aligned to df.index
+    """
+    codes, invoices = pd.factorize(df['InvoiceNo'])
+    n_invoices = len(invoices)
+    valid = codes >= 0
+    invoice_codes = codes[valid]
+    
+    def per_invoice(values: pd.Series) -> np.ndarray:
+        return np.bincount(invoice_codes, weights=values.to_numpy(dtype=np.float64)[valid],
+                           minlength=n_invoices)
+    
+    row_counts = np.bincount(invoice_codes, minlength=n_invoices)
+    
+    # Distinct products per invoice: count unique (invoice, product) pairs packed into one int64
+    product_codes, products = pd.factorize(df['StockCode'])
+    has_product = product_codes[valid] >= 0
+    pairs = invoice_codes[has_product].astype(np.int64) * len(products) + product_codes[valid][has_product]
+    unique_items = np.bincount(pd.unique(pairs) // max(len(products), 1), minlength=n_invoices)
+    
+    stats = pd.DataFrame({
+        'ItemCount': per_invoice(df['Quantity']),
+        'UniqueItems': unique_items,
+        'AvgItemPrice': per_invoice(df['UnitPrice']) / np.maximum(row_counts, 1),
+        'InvoiceTotal': per_invoice(df['TransactionValue'])
+    })
+    
+    # Integer quantities keep an integer item count
+    if pd.api.types.is_integer_dtype(df['Quantity']):
+        stats['ItemCount'] = stats['ItemCount'].astype(np.int64)
+    
+    if valid.all():
+        return stats.take(codes).set_axis(df.index)
+    return stats.reindex(codes).set_axis(df.index)
+
+
 class RetailDataProcessor:
     """
     Class for processing and transforming retail data for analysis
@@ -18,10 +72,13 @@ class RetailDataProcessor:
         """
         Initialize the data processor with a DataFrame
         
+        The frame is kept by reference, not copied; the processor only ever adds
+        columns to its own shallow copies and never modifies the input's values.
+        
         Args:
             df (pd.DataFrame): Input DataFrame containing retail data
         """
-        self.raw_data = df.copy()
+        self.raw_data = df
         self.processed_data = None
 
     def process_transactions(self) -> pd.DataFrame:
@@ -31,19 +88,22 @@ class RetailDataProcessor:
         Returns:
             pd.DataFrame: Processed transaction data
         """
-        df = self.raw_data.copy()
+        # Shallow copy: new columns land on this frame only, while the existing
+        # column data is shared with raw_data rather than duplicated
+        df = self.raw_data.copy(deep=False)
         
         # Calculate transaction-level metrics
         df['TransactionValue'] = df['Quantity'] * df['UnitPrice']
-        df['ItemCount'] = df.groupby('InvoiceNo')['Quantity'].transform('sum')
-        df['UniqueItems'] = df.groupby('InvoiceNo')['StockCode'].transform('nunique')
+        invoice_stats = _invoice_stats(df)
+        df['ItemCount'] = invoice_stats['ItemCount']
+        df['UniqueItems'] = invoice_stats['UniqueItems']
         
         # Calculate average item price per transaction
-        df['AvgItemPrice'] = df.groupby('InvoiceNo')['UnitPrice'].transform('mean')
+        df['AvgItemPrice'] = invoice_stats['AvgItemPrice']
         
         # Flag high-value transactions (top 10%)
-        value_threshold = df.groupby('InvoiceNo')['TransactionValue'].transform('sum').quantile(0.9)
-        df['IsHighValue'] = df.groupby('InvoiceNo')['TransactionValue'].transform('sum') > value_threshold
+        value_threshold = invoice_stats['InvoiceTotal'].quantile(0.9)
+        df['IsHighValue'] = invoice_stats['InvoiceTotal'] > value_threshold
         
         return df
 
@@ -56,7 +116,7 @@ class RetailDataProcessor:
         """
         df = self.processed_data if self.processed_data is not None else self.raw_data
         
-        product_metrics = df.groupby('StockCode').agg({
+        product_metrics = df.groupby('StockCode', observed=True).agg({
             'Description': 'first',
             'Quantity': ['sum', 'mean', 'std'],
             'UnitPrice': 'mean',
@@ -88,7 +148,7 @@ class RetailDataProcessor:
         df = self.processed_data if self.processed_data is not None else self.raw_data
         
         # Calculate customer-level metrics
-        customer_metrics = df.groupby('CustomerID').agg({
+        customer_metrics = df.groupby('CustomerID', observed=True).agg({
             'InvoiceNo': 'nunique',
             'TransactionValue': 'sum',
             'InvoiceDate': ['min', 'max'],
@@ -101,13 +161,19 @@ class RetailDataProcessor:
                                   'FirstPurchase', 'LastPurchase', 'UniqueProducts',
                                   'TotalItems']
         
-        # Calculate customer lifecycle metrics
-        customer_metrics['CustomerAge'] = (customer_metrics['LastPurchase'] - 
-                                         customer_metrics['FirstPurchase']).dt.days
-        customer_metrics['AvgTransactionValue'] = (customer_metrics['TotalSpend'] / 
-                                                 customer_metrics['TransactionCount'])
-        customer_metrics['PurchaseFrequency'] = (customer_metrics['TransactionCount'] / 
-                                               customer_metrics['CustomerAge'])
+        # Calculate customer lifecycle metrics on the underlying arrays, skipping
+        # the Series alignment and intermediate Series of column arithmetic
+        customer_age = (customer_metrics['LastPurchase'] - 
+                        customer_metrics['FirstPurchase']).dt.days.to_numpy()
+        transaction_count = customer_metrics['TransactionCount'].to_numpy(dtype=np.float64)
+        
+        customer_metrics['CustomerAge'] = customer_age
+        customer_metrics['AvgTransactionValue'] = (
+            customer_metrics['TotalSpend'].to_numpy(dtype=np.float64) / transaction_count
+        )
+        # Customers whose purchases all fall on one day count as a one-day lifetime
+        # instead of dividing by zero
+        customer_metrics['PurchaseFrequency'] = transaction_count / np.maximum(customer_age, 1)
         
         return customer_metrics
 
@@ -120,13 +186,15 @@ class RetailDataProcessor:
         """
         df = self.processed_data if self.processed_data is not None else self.raw_data
         
-        # Daily metrics
-        daily_metrics = df.groupby(df['InvoiceDate'].dt.date).agg({
+        # Daily metrics, keyed on datetime64 days (int64 hashing) rather than date
+        # objects; the keys are turned into dates once, per day rather than per row
+        daily_metrics = df.groupby(df['InvoiceDate'].dt.floor('D')).agg({
             'TransactionValue': 'sum',
             'InvoiceNo': 'nunique',
             'CustomerID': 'nunique',
             'Quantity': 'sum'
         }).reset_index()
+        daily_metrics['InvoiceDate'] = daily_metrics['InvoiceDate'].dt.date
         
         # Weekly metrics
         weekly_metrics = df.groupby(pd.Grouper(key='InvoiceDate', freq='W')).agg({
@@ -159,32 +227,33 @@ class RetailDataProcessor:
         """
         df = self.processed_data if self.processed_data is not None else self.raw_data
         
-        # Create transaction-product matrix
-        transaction_matrix = pd.crosstab(df['InvoiceNo'], df['StockCode'])
-        
-        # Calculate product co-occurrence
-        product_combinations = []
-        products = transaction_matrix.columns
-        
-        for i in range(len(products)):
-            for j in range(i + 1, len(products)):
-                prod1, prod2 = products[i], products[j]
-                co_occurrences = ((transaction_matrix[prod1] > 0) & 
-                                (transaction_matrix[prod2] > 0)).sum()
-                
-                if co_occurrences > 0:
-                    support = co_occurrences / len(transaction_matrix)
-                    confidence = co_occurrences / (transaction_matrix[prod1] > 0).sum()
-                    
-                    product_combinations.append({
-                        'Product1': prod1,
-                        'Product2': prod2,
-                        'CoOccurrences': co_occurrences,
-                        'Support': support,
-                        'Confidence': confidence
-                    })
-        
-        return pd.DataFrame(product_combinations)
+        # Sparse invoice x product incidence matrix; sorted codes keep products
+        # in the same order the dense crosstab used
+        invoice_codes, invoices = pd.factorize(df['InvoiceNo'], sort=True)
+        product_codes, products = pd.factorize(df['StockCode'], sort=True)
+        valid = (invoice_codes >= 0) & (product_codes >= 0)
+        transaction_matrix = csr_matrix(
+            (np.ones(valid.sum(), dtype=np.int32), (invoice_codes[valid], product_codes[valid])),
+            shape=(len(invoices), len(products))
+        )
+        # Duplicate lines of a product within an invoice count once
+        transaction_matrix.sum_duplicates()
+        transaction_matrix.data[:] = 1
+        
+        # M.T @ M counts, for every product pair, the invoices containing both
+        co_occurrence = sparse_triu(transaction_matrix.T @ transaction_matrix, k=1).tocoo()
+        order = np.lexsort((co_occurrence.col, co_occurrence.row))
+        prod1, prod2 = co_occurrence.row[order], co_occurrence.col[order]
+        co_occurrences = co_occurrence.data[order].astype(np.int64)
+        product_invoices = np.asarray(transaction_matrix.sum(axis=0)).ravel()
+        
+        return pd.DataFrame({
+            'Product1': np.asarray(products)[prod1],
+            'Product2': np.asarray(products)[prod2],
+            'CoOccurrences': co_occurrences,
+            'Support': co_occurrences / len(invoices),
+            'Confidence': co_occurrences / product_invoices[prod1]
+        })
 
     def process_data(self) -> pd.DataFrame:
         """
@@ -201,17 +270,27 @@ class RetailDataProcessor:
             logger.info("Transaction processing completed")
             
             # Add temporal features
-            self.processed_data['DayOfWeek'] = self.processed_data['InvoiceDate'].dt.day_name()
-            self.processed_data['Month'] = self.processed_data['InvoiceDate'].dt.month
-            self.processed_data['Quarter'] = self.processed_data['InvoiceDate'].dt.quarter
-            self.processed_data['Year'] = self.processed_data['InvoiceDate'].dt.year
-            self.processed_data['Hour'] = self.processed_data['InvoiceDate'].dt.hour
+            date_parts = get_date_parts(self.processed_data['InvoiceDate'])
+            # Weekday names as an ordered categorical over the day numbers: one
+            # byte per row instead of a Python string, and sorts Monday first
+            dow_codes = np.nan_to_num(date_parts['DayOfWeek'], nan=-1).astype(np.int8)
+            self.processed_data['DayOfWeek'] = pd.Categorical.from_codes(
+                dow_codes, categories=WEEKDAY_NAMES, ordered=True
+            )
+            self.processed_data['Month'] = date_parts['Month']
+            # Month -> quarter in place on one scratch array rather than a temporary per operator
+            quarter = date_parts['Month'] - 1
+            quarter //= 3
+            quarter += 1
+            self.processed_data['Quarter'] = quarter
+            self.processed_data['Year'] = date_parts['Year']
+            self.processed_data['Hour'] = date_parts['Hour']
             logger.info("Temporal features added")
             
             # Add transaction complexity indicators
-            self.processed_data['IsComplexTransaction'] = (
-                self.processed_data['UniqueItems'] > 
-                self.processed_data['UniqueItems'].median()
+            unique_items = self.processed_data['UniqueItems']
+            self.processed_data['IsComplexTransaction'] = np.greater(
+                unique_items.to_numpy(), unique_items.median()
             )
             
             # Add customer value indicators
@@ -239,12 +318,15 @@ class RetailDataProcessor:
         if self.processed_data is None:
             raise ValueError("Data not processed. Call process_data() first.")
             
+        # Per-invoice totals only feed means, so skip unobserved categories and the key sort
+        invoice_groups = self.processed_data.groupby('InvoiceNo', observed=True, sort=False)
+        
         summary_stats = {
             'total_revenue': self.processed_data['TransactionValue'].sum(),
-            'avg_transaction_value': self.processed_data.groupby('InvoiceNo')['TransactionValue'].sum().mean(),
+            'avg_transaction_value': invoice_groups['TransactionValue'].sum().mean(),
             'total_transactions': self.processed_data['InvoiceNo'].nunique(),
             'total_customers': self.processed_data['CustomerID'].nunique(),
-            'avg_items_per_transaction': self.processed_data.groupby('InvoiceNo')['Quantity'].sum().mean(),
+            'avg_items_per_transaction': invoice_groups['Quantity'].sum().mean(),
             'total_quantity_sold': self.processed_data['Quantity'].sum()
         }
         
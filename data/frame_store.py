@@ -0,0 +1,166 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+# dcc.Store payload pointing at a stored frame: {'sid': str, 'version': str}
+FrameRef = Dict[str, Any]
+
+# Filtered frames live in shared memory when the host has it so every
+# worker process maps the same pages instead of decoding its own copy.
+_SHM_DIR = Path('/dev/shm')
+FRAME_STORE_DIR = (_SHM_DIR if _SHM_DIR.is_dir() else Path(tempfile.gettempdir())) / 'retail-dashboard'
+
+# Frames not written or read for this long are pruned on the next write
+FRAME_MAX_AGE = 3600
+
+
+def make_frame_id(*filters: Any) -> str:
+    """Derive a stable frame id from the filter values that produced it."""
+    return hashlib.md5(repr(filters).encode('utf-8')).hexdigest()
+
+
+# Schema metadata key holding the content hash of a stored frame
+_VERSION_KEY = b'frame_version'
+
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Hash a frame's contents so identical selections share one store reference."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=8).hexdigest()
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert a frame to Arrow, stringifying object columns that mix types (e.g. int and 'C'-prefixed invoice numbers)."""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            if pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty'):
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _frame_path(sid: str) -> Path:
+    return FRAME_STORE_DIR / f'session_{sid}.arrow'
+
+
+def _stored_version(path: Path) -> Optional[str]:
+    try:
+        metadata = pa.ipc.open_file(pa.memory_map(str(path), 'r')).schema.metadata or {}
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+    version = metadata.get(_VERSION_KEY)
+    return version.decode() if version else None
+
+
+def write_frame(df: pd.DataFrame, sid: str) -> FrameRef:
+    """
+    Write a DataFrame to the shared Arrow store and return its store reference
+
+    Args:
+        df (pd.DataFrame): Frame to persist
+        sid (str): Frame id, usually from make_frame_id
+
+    Returns:
+        FrameRef: {'sid', 'version'} reference to keep in dcc.Store; the version
+            is a content hash, so rewriting the same rows returns an equal reference
+    """
+    FRAME_STORE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _frame_path(sid)
+    df = df.reset_index(drop=True)
+    version = frame_version(df)
+
+    if _stored_version(path) == version:
+        # Same rows are already on disk; just mark them as recently used
+        os.utime(path)
+    else:
+        table = _to_arrow(df)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _VERSION_KEY: version.encode()})
+
+        # Write to a private file and rename so readers never map a partial frame
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+
+    prune_frames()
+    return {'sid': sid, 'version': version}
+
+
+@lru_cache(maxsize=4)
+def _decode_frame(sid: str, version: str) -> pd.DataFrame:
+    """
+    Decode a stored frame once per process
+    
+    Keyed by the content version as well as the id, so a frame rewritten with
+    different rows is decoded afresh while every chart of one tab render shares
+    a single decode. A file whose embedded version differs from the requested one
+    raises LookupError instead of being cached under the stale key.
+    """
+    reader = pa.ipc.open_file(pa.memory_map(str(_frame_path(sid)), 'r'))
+    stored = (reader.schema.metadata or {}).get(_VERSION_KEY)
+    if stored is None or stored.decode() != version:
+        raise LookupError(f"Stored frame {sid} no longer holds version {version}")
+    return reader.read_pandas()
+
+
+def read_frame(ref: FrameRef) -> pd.DataFrame:
+    """
+    Map a stored frame back into a DataFrame without re-parsing it
+
+    Args:
+        ref (FrameRef): Store reference returned by write_frame
+
+    Returns:
+        pd.DataFrame: The stored frame; a shallow copy, so callers may add or
+            replace columns without touching the shared decode
+
+    Raises:
+        LookupError: The frame id was rewritten with other rows since ref was
+            issued; the caller should filter again
+    """
+    df = _decode_frame(ref['sid'], ref['version'])
+
+    # Refresh the access time so frames still in use survive pruning
+    path = _frame_path(ref['sid'])
+    try:
+        os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+    except FileNotFoundError:
+        pass
+    return df.copy(deep=False)
+
+
+def frame_exists(ref: Optional[FrameRef]) -> bool:
+    """
+    Check whether a store reference still points at its frame on disk
+    
+    Frames outlive restarts in shared memory, and a frame id may since have been
+    rewritten with other rows, so the stored content version must match the
+    reference's; only the schema is read from the mapped file.
+    """
+    return bool(ref) and _stored_version(_frame_path(ref['sid'])) == ref.get('version')
+
+
+def prune_frames(max_age: int = FRAME_MAX_AGE) -> None:
+    """Remove frames that have not been written or read within max_age seconds."""
+    cutoff = time.time() - max_age
+    for path in FRAME_STORE_DIR.glob('session_*.arrow'):
+        try:
+            stat = path.stat()
+            if max(stat.st_atime, stat.st_mtime) < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.error("Error pruning frame %s: %s", path.name, e)
@@ -1,16 +1,20 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Deque
+from collections import deque
 import traceback
 import logging
 from dash import html
 import dash_bootstrap_components as dbc
 from datetime import datetime
 
+# Most recent errors kept per callback in the error history
+ERROR_HISTORY_LIMIT = 100
+
 class DashboardErrorHandler:
     """Error handler for the dashboard application"""
     
     def __init__(self, logger: logging.Logger):
         self.logger = logger
-        self.error_history: Dict[str, list] = {}
+        self.error_history: Dict[str, Deque[Dict[str, Any]]] = {}
         
     def handle_callback_error(self, error: Exception, callback_id: str, inputs: Dict[str, Any]) -> html.Div:
         """
@@ -24,15 +28,19 @@ class DashboardErrorHandler:
         Returns:
             html.Div: Error message component for display
         """
-        # Log the error
-        error_msg = self._format_error_details(error, callback_id, inputs)
-        self.logger.error(error_msg)
+        # Log the error; exc_info defers formatting the traceback to the log handler
+        self.logger.error("Error in callback %s: %s (inputs=%s)", callback_id, error, inputs,
+                          exc_info=error)
         
-        # Store in error history
-        self.error_history.setdefault(callback_id, []).append({
+        # Store in error history; the stack is extracted without frame references
+        # or source lines, so it pins no locals and is only rendered on read
+        self.error_history.setdefault(callback_id, deque(maxlen=ERROR_HISTORY_LIMIT)).append({
             'timestamp': datetime.now(),
             'error': str(error),
-            'traceback': traceback.format_exc(),
+            'exception': ''.join(traceback.format_exception_only(type(error), error)),
+            'stack': traceback.StackSummary.extract(
+                traceback.walk_tb(error.__traceback__), lookup_lines=False
+            ),
             'inputs': inputs
         })
         
@@ -50,9 +58,8 @@ class DashboardErrorHandler:
         Returns:
             html.Div: Error message component for display
         """
-        # Log the error
-        error_msg = f"Data Error in {operation}: {str(error)}\n{traceback.format_exc()}"
-        self.logger.error(error_msg)
+        # Log the error; exc_info defers formatting the traceback to the log handler
+        self.logger.error("Data Error in %s: %s", operation, error, exc_info=error)
         
         # Return user-friendly error component
         return self._create_error_component(
@@ -69,9 +76,7 @@ class DashboardErrorHandler:
             f"Timestamp: {datetime.now()}",
             f"Error Type: {type(error).__name__}",
             f"Error Message: {str(error)}",
-            f"Callback Inputs: {inputs}",
-            "Traceback:",
-            traceback.format_exc()
+            f"Callback Inputs: {inputs}"
         ]
         return "\n".join(details)
         
@@ -93,11 +98,36 @@ class DashboardErrorHandler:
             className="mb-3"
         )
         
-    def get_error_history(self, callback_id: Optional[str] = None) -> Dict[str, list]:
-        """Get error history for analysis"""
+    def get_error_history(self, callback_id: Optional[str] = None,
+                          formatted: bool = False) -> Dict[str, list]:
+        """
+        Get error history for analysis
+        
+        Args:
+            callback_id: Only return errors for this callback
+            formatted: Replace each entry's extracted stack with its traceback text
+            
+        Returns:
+            Dict[str, list]: Error entries keyed by callback ID
+        """
         if callback_id:
-            return {callback_id: self.error_history.get(callback_id, [])}
-        return self.error_history.copy()
+            history = {callback_id: list(self.error_history.get(callback_id, []))}
+        else:
+            history = {key: list(entries) for key, entries in self.error_history.items()}
+        if not formatted:
+            return history
+        return {
+            key: [self._format_entry(entry) for entry in entries]
+            for key, entries in history.items()
+        }
+        
+    @staticmethod
+    def _format_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a history entry with its stack rendered as format_exc() would"""
+        formatted = {k: v for k, v in entry.items() if k not in ('stack', 'exception')}
+        lines = ['Traceback (most recent call last):\n'] if entry['stack'] else []
+        formatted['traceback'] = ''.join(lines + entry['stack'].format() + [entry['exception']])
+        return formatted
         
     def clear_error_history(self, callback_id: Optional[str] = None):
         """Clear error history"""
@@ -4,8 +4,10 @@ from dash.dependencies import Input, Output, State
 import dash
 from app import app, cache, loading_spinner_config, loading_spinner_style
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import os
+import time
 from components.header import create_header
 from components.kpi_cards import create_kpi_cards
 from components.sales_charts import create_sales_summary
@@ -13,6 +15,7 @@ from components.product_charts import create_product_summary
 from components.customer_charts import create_customer_summary
 from components.geographic_charts import create_geographic_summary
 from data.data_loader import RetailDataLoader
+from data.frame_store import FrameRef, make_frame_id, write_frame, frame_exists
 import logging
 from logging_config import setup_logging, log_error
 from monitor_utils import DashboardMonitor, monitor_callback, validate_dataframe
@@ -36,10 +39,24 @@ print(DATA_PATH)
 CACHE_DIR = 'data/processed'
 loader = RetailDataLoader(DATA_PATH, CACHE_DIR)
 
-def make_cache_key():
-    data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Online_Retail.xlsx')
-    if os.path.exists(data_path):
-        mtime = os.path.getmtime(data_path)
+# Seconds a looked-up workbook mtime is reused before stat() is called again
+DATA_MTIME_TTL = 60
+_data_mtime = (None, float('-inf'))  # (mtime or None, monotonic time of the lookup)
+
+def get_data_mtime():
+    """Workbook mtime (None if missing), re-checked at most every DATA_MTIME_TTL seconds"""
+    global _data_mtime
+    mtime, checked_at = _data_mtime
+    now = time.monotonic()
+    if now - checked_at > DATA_MTIME_TTL:
+        mtime = os.path.getmtime(DATA_PATH) if os.path.exists(DATA_PATH) else None
+        _data_mtime = (mtime, now)
+    return mtime
+
+def make_cache_key(fname=None):
+    # Flask-Caching passes the memoized function's name to make_name
+    mtime = get_data_mtime()
+    if mtime is not None:
         return f'retail_data_{mtime}'
     return 'retail_data_default'
 
@@ -47,11 +64,17 @@ def make_cache_key():
 def load_initial_data():
     try:
         logger.info("Loading initial data...")
-        df = pd.read_excel(DATA_PATH)
+        # The loader's parquet cache is the only on-disk copy of the workbook;
+        # it is rebuilt whenever the workbook changes
+        df = loader.load_data()
         if not validate_dataframe(df, data_logger):
             raise ValueError("Data validation failed")
         if df is not None and not df.empty:
-            df['TotalAmount'] = df['Quantity'] * df['UnitPrice']
+            # The loader stores text IDs as categoricals; the callbacks group on
+            # them without observed=True, so hand them plain strings (NaN stays missing)
+            for col in ('InvoiceNo', 'StockCode', 'Description'):
+                df[col] = df[col].astype(object).where(df[col].notna(), np.nan)
+            df = df.astype({'Quantity': 'int32', 'UnitPrice': 'float32', 'CustomerID': 'float32'})
             logger.info(f"Data loaded successfully: {len(df)} rows")
             return df, df['InvoiceDate'].min(), df['InvoiceDate'].max()
     except Exception as e:
@@ -61,11 +84,59 @@ def load_initial_data():
 # Update where initial data is loaded
 df, start_date, end_date = load_initial_data()
 
-# Initialize store with full dataset
-if not df.empty:
-    initial_filtered_data = df.to_json(date_format='iso', orient='split')
-else:
-    initial_filtered_data = None
+# Date filters binary-search the sorted dates and country filters merge
+# precomputed row positions, instead of comparing every row on each change
+if not df.empty and not df['InvoiceDate'].is_monotonic_increasing:
+    df = df.sort_values('InvoiceDate', kind='stable', ignore_index=True)
+INVOICE_DATES = df['InvoiceDate'].to_numpy() if not df.empty else np.array([], dtype='datetime64[ns]')
+COUNTRY_ROWS = df.groupby('Country', observed=True, sort=False).indices if not df.empty else {}
+# Filter options come from the same grouping, so the layout needs no extra scan
+COUNTRIES = sorted(COUNTRY_ROWS)
+
+def filter_rows(start_date, end_date, countries=None) -> pd.DataFrame:
+    """
+    Select rows dated within [start_date, end_date] and, optionally, in the given countries
+    
+    Args:
+        start_date: Inclusive lower date bound (timestamp or date string)
+        end_date: Inclusive upper date bound (timestamp or date string)
+        countries (List[str], optional): Countries to keep; all when empty
+        
+    Returns:
+        pd.DataFrame: Matching rows in date order
+    """
+    lo = INVOICE_DATES.searchsorted(np.datetime64(pd.Timestamp(start_date)), side='left')
+    hi = INVOICE_DATES.searchsorted(np.datetime64(pd.Timestamp(end_date)), side='right')
+    if not countries:
+        return df.iloc[lo:hi]
+    
+    # Trim each country's (already ascending) positions to the date bounds first,
+    # so only in-range rows are merged and a single country needs no sort at all
+    rows = [
+        positions[positions.searchsorted(lo):positions.searchsorted(hi)]
+        for positions in (COUNTRY_ROWS[c] for c in countries if c in COUNTRY_ROWS)
+    ]
+    if not rows:
+        return df.iloc[:0]
+    if len(rows) == 1:
+        return df.iloc[rows[0]]
+    rows = np.concatenate(rows)
+    rows.sort()
+    return df.iloc[rows]
+
+# The full-dataset frame is written on first use rather than at import, so
+# starting a worker doesn't hash and write every row up front
+INITIAL_FRAME_ID = make_frame_id('all')
+initial_filtered_data = None
+
+def get_initial_filtered_data():
+    """Return the full-dataset store reference, writing it on first use or after it was pruned"""
+    global initial_filtered_data
+    if df.empty:
+        return None
+    if initial_filtered_data is None or not frame_exists(initial_filtered_data):
+        initial_filtered_data = write_frame(df, INITIAL_FRAME_ID)
+    return initial_filtered_data
 
 # Define the navbar
 navbar = dbc.Navbar(
@@ -115,7 +186,7 @@ app.layout = html.Div([
     create_header(
         start_date=start_date,
         end_date=end_date,
-        countries=df['Country'].unique().tolist() if not df.empty else [],
+        countries=COUNTRIES,
         # categories=df['Category'].unique().tolist() if 'Category' in df.columns else []
     ),
     
@@ -161,15 +232,41 @@ app.layout = html.Div([
     ], fluid=True)
 ])
 
-@app.callback(
-    Output('filtered-data-store', 'data'),
-    [Input('date-filter', 'start_date')],
-    [State('filtered-data-store', 'data')]
-)
-def initialize_store(start_date, current_data):
-    if current_data is None:
-        return initial_filtered_data
-    return current_data
+def render_overview(filtered_data: FrameRef) -> dbc.Container:
+    """Overview tab: KPI cards above the sales summary"""
+    return dbc.Container([
+        create_kpi_cards(filtered_data),
+        dbc.Row([
+            dbc.Col(create_sales_summary(filtered_data), md=12)
+        ], className="mb-4")
+    ], fluid=True)
+
+# Renderer for each tab ID
+TAB_RENDERERS = {
+    'overview-tab': render_overview,
+    'sales-tab': create_sales_summary,
+    'products-tab': create_product_summary,
+    'customers-tab': create_customer_summary,
+    'geography-tab': create_geographic_summary
+}
+
+@cache.memoize(timeout=600)
+def render_tab(active_tab: str, filtered_data: FrameRef):
+    """
+    Build a tab's component tree, memoized per tab and frame reference
+    
+    The reference carries the frame's content hash, so switching back to a tab
+    with unchanged filters returns the cached tree without rebuilding any chart.
+    
+    Args:
+        active_tab (str): ID of the selected tab
+        filtered_data (FrameRef): Store reference to the filtered frame
+        
+    Returns:
+        The tab's Dash component, or None for an unknown tab
+    """
+    renderer = TAB_RENDERERS.get(active_tab)
+    return renderer(filtered_data) if renderer is not None else None
 
 # Unified callback for tab content
 @app.callback(
@@ -182,27 +279,14 @@ def update_tab_content(active_tab, filtered_data):
     try:
         logger.info(f"Updating tab content: {active_tab}")
         
-        if filtered_data is None:
+        # The store only carries a frame reference; each chart reads the frame
+        # itself (memoized per reference), so nothing is decoded here
+        if not frame_exists(filtered_data):
             logger.warning("No filtered data available")
             return html.Div("No data available. Please check data loading.")
 
         try:
-            df = pd.read_json(filtered_data, orient='split')
-            if active_tab == 'overview-tab':
-                return dbc.Container([
-                    create_kpi_cards(filtered_data),
-                    dbc.Row([
-                        dbc.Col(create_sales_summary(filtered_data), md=12)
-                    ], className="mb-4")
-                ], fluid=True)
-            elif active_tab == 'sales-tab':
-                return create_sales_summary(filtered_data)
-            elif active_tab == 'products-tab':
-                return create_product_summary(filtered_data)
-            elif active_tab == 'customers-tab':
-                return create_customer_summary(filtered_data)
-            elif active_tab == 'geography-tab':
-                return create_geographic_summary(filtered_data)
+            return render_tab(active_tab, filtered_data)
         except Exception as e:
             logger.error(f"Error updating tab content: {e}")
             return html.Div(f"Error loading content: {str(e)}")
@@ -214,7 +298,7 @@ def update_tab_content(active_tab, filtered_data):
         })
 
 @app.callback(
-    Output('filtered-data-store', 'data', allow_duplicate=True),
+    Output('filtered-data-store', 'data'),
     [Input('date-filter', 'start_date'),
      Input('date-filter', 'end_date'),
      Input('country-filter', 'value'),
@@ -222,12 +306,19 @@ def update_tab_content(active_tab, filtered_data):
      Input('last-quarter', 'n_clicks'),
      Input('ytd', 'n_clicks'),
      Input('all-time', 'n_clicks')],
-     prevent_initial_call=True
+    [State('filtered-data-store', 'data')]
 )
 def update_filtered_data(start_date, end_date, countries, *args):
+    # Trailing State after the four quick-range button clicks
+    current_data = args[-1]
     ctx = dash.callback_context
     if not ctx.triggered:
-        return initial_filtered_data if not df.empty else None
+        # Page load: this is the store's only writer, so keep a selection whose
+        # rows are still on disk unchanged and only fall back to the full
+        # dataset otherwise
+        if frame_exists(current_data):
+            return dash.no_update
+        return get_initial_filtered_data()
 
     triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
     
@@ -245,11 +336,12 @@ def update_filtered_data(start_date, end_date, countries, *args):
         end_date = df['InvoiceDate'].max()
 
     try:
-        mask = (df['InvoiceDate'] >= start_date) & (df['InvoiceDate'] <= end_date)
-        if countries and len(countries) > 0:
-            mask &= df['Country'].isin(countries)
-        filtered_df = df[mask]
-        return filtered_df.to_json(date_format='iso', orient='split')
+        filtered_df = filter_rows(start_date, end_date, countries)
+        filtered_ref = write_frame(filtered_df, make_frame_id(start_date, end_date, countries))
+        # Same rows as the current selection: skip re-rendering the tab entirely
+        if current_data and current_data.get('version') == filtered_ref['version']:
+            return dash.no_update
+        return filtered_ref
     except Exception as e:
         logger.error(f"Error filtering data: {e}")
         return None
@@ -1,10 +1,46 @@
 import logging
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from logging.handlers import MemoryHandler, RotatingFileHandler, TimedRotatingFileHandler
 import os
+import threading
 from datetime import datetime
 
+# Records buffered before an INFO log file is written; ERROR records flush at once.
+# Buffered INFO/WARNING lines also reach the file within LOG_FLUSH_INTERVAL seconds.
+# Records still in the buffer are lost if the process is killed hard (SIGKILL, OOM).
+LOG_BUFFER_CAPACITY = 64
+LOG_FLUSH_INTERVAL = 5.0
+
+class PeriodicMemoryHandler(MemoryHandler):
+    """
+    MemoryHandler that also writes its buffer out every flush_interval seconds
+    
+    A quiet worker would otherwise hold fewer than capacity records in memory
+    indefinitely, so recent INFO and WARNING lines would never reach the file.
+    """
+    def __init__(self, capacity: int, flushLevel: int, target: logging.Handler,
+                 flush_interval: float = LOG_FLUSH_INTERVAL):
+        super().__init__(capacity, flushLevel=flushLevel, target=target)
+        self.flush_interval = flush_interval
+        self._closed = threading.Event()
+        threading.Thread(target=self._flush_periodically, name='log-flush', daemon=True).start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        super().close()
+
+def _replace_handlers(logger: logging.Logger) -> None:
+    """Remove a logger's handlers, stopping the flush threads of buffered ones"""
+    for handler in logger.handlers:
+        if isinstance(handler, PeriodicMemoryHandler):
+            handler.close()
+    logger.handlers = []
+
 def setup_logging(log_dir: str = "logs"):
     """
     Set up logging configuration with both file and console handlers
@@ -29,10 +65,18 @@ def setup_logging(log_dir: str = "logs"):
         filename=os.path.join(log_dir, 'app.log'),
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     main_handler.setFormatter(detailed_formatter)
     main_handler.setLevel(logging.INFO)
+    # Batch INFO records into one write instead of a file write per record
+    buffered_main_handler = PeriodicMemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=main_handler
+    )
+    buffered_main_handler.setLevel(logging.INFO)
 
     # Error log - Rotating daily
     error_handler = TimedRotatingFileHandler(
@@ -40,7 +84,8 @@ def setup_logging(log_dir: str = "logs"):
         when='midnight',
         interval=1,
         backupCount=30,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     error_handler.setFormatter(detailed_formatter)
     error_handler.setLevel(logging.ERROR)
@@ -55,10 +100,10 @@ def setup_logging(log_dir: str = "logs"):
     root_logger.setLevel(logging.INFO)
 
     # Remove any existing handlers
-    root_logger.handlers = []
+    _replace_handlers(root_logger)
 
     # Add handlers
-    root_logger.addHandler(main_handler)
+    root_logger.addHandler(buffered_main_handler)
     root_logger.addHandler(error_handler)
     root_logger.addHandler(console_handler)
 
@@ -94,14 +139,19 @@ def setup_component_logger(component: str, log_dir: str) -> logging.Logger:
         filename=os.path.join(component_dir, f'{component}.log'),
         maxBytes=5*1024*1024,  # 5MB
         backupCount=3,
-        encoding='utf-8'
+        encoding='utf-8',
+        delay=True
     )
     handler.setFormatter(logging.Formatter(
         '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
     ))
     
-    logger.handlers = []  # Remove any existing handlers
-    logger.addHandler(handler)
+    _replace_handlers(logger)  # Remove any existing handlers
+    logger.addHandler(PeriodicMemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=handler
+    ))
     
     return logger
 
@@ -114,14 +164,11 @@ def log_error(logger: logging.Logger, error: Exception, context: str = None):
         error (Exception): Exception to log
         context (str, optional): Additional context information
     """
-    import traceback
-    error_msg = f"Error occurred"
+    # exc_info lets the handlers format the traceback, and only when a record is emitted
     if context:
-        error_msg += f" in {context}"
-    error_msg += f": {str(error)}\n"
-    error_msg += "Traceback:\n"
-    error_msg += traceback.format_exc()
-    logger.error(error_msg)
+        logger.error("Error occurred in %s: %s", context, error, exc_info=error)
+    else:
+        logger.error("Error occurred: %s", error, exc_info=error)
 
 # Usage example for testing
 if __name__ == "__main__":
@@ -2,8 +2,10 @@ import functools
 import time
 import traceback
 import logging
+from collections import deque
+import numpy as np
 import pandas as pd
-from typing import Callable, Any, Dict
+from typing import Callable, Any, Deque, Dict, Tuple
 from datetime import datetime
 
 class DashboardMonitor:
@@ -11,22 +13,24 @@ class DashboardMonitor:
     
     def __init__(self, logger: logging.Logger):
         self.logger = logger
-        self.operation_times: Dict[str, float] = {}
+        # Recent (operation, seconds) timings; bounded so long sessions don't grow it
+        self.operation_times: Deque[Tuple[str, float]] = deque(maxlen=1024)
         self.error_counts: Dict[str, int] = {}
         
     def log_performance(self, operation: str, execution_time: float):
         """Log performance metrics for an operation"""
-        self.operation_times[operation] = execution_time
-        self.logger.info(f"Performance - {operation}: {execution_time:.2f}s")
+        self.operation_times.append((operation, execution_time))
+        # %-style arguments are only formatted if INFO records are emitted
+        self.logger.info("Performance - %s: %.2fs", operation, execution_time)
         
     def log_error(self, operation: str, error: Exception):
         """Log error and update error counts"""
         self.error_counts[operation] = self.error_counts.get(operation, 0) + 1
-        self.logger.error(f"Error in {operation}: {str(error)}\n{traceback.format_exc()}")
+        self.logger.error("Error in %s: %s", operation, error, exc_info=error)
         
     def get_performance_summary(self) -> Dict[str, float]:
-        """Get summary of operation performance"""
-        return self.operation_times.copy()
+        """Get the latest execution time of each recorded operation"""
+        return dict(self.operation_times)
         
     def get_error_summary(self) -> Dict[str, int]:
         """Get summary of error counts"""
@@ -38,10 +42,10 @@ def monitor_callback(monitor: DashboardMonitor):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             operation = func.__name__
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             try:
                 result = func(*args, **kwargs)
-                execution_time = time.time() - start_time
+                execution_time = (time.perf_counter_ns() - start_ns) * 1e-9
                 monitor.log_performance(operation, execution_time)
                 return result
             except Exception as e:
@@ -50,6 +54,12 @@ def monitor_callback(monitor: DashboardMonitor):
         return wrapper
     return decorator
 
+def _count_non_positive(values: pd.Series) -> int:
+    """Count values <= 0 with a single compare-and-count pass; missing values are not counted"""
+    if isinstance(values.dtype, np.dtype):
+        return int(np.count_nonzero(values.to_numpy() <= 0))
+    return int((values <= 0).sum())
+
 def validate_dataframe(df: 'pd.DataFrame', logger: logging.Logger) -> bool:
     """
     Validate DataFrame contents and log any issues
@@ -75,14 +85,14 @@ def validate_dataframe(df: 'pd.DataFrame', logger: logging.Logger) -> bool:
             return False
             
         # Check for invalid values
-        invalid_quantities = df['Quantity'] <= 0
-        invalid_prices = df['UnitPrice'] <= 0
+        invalid_quantities = _count_non_positive(df['Quantity'])
+        invalid_prices = _count_non_positive(df['UnitPrice'])
         
-        if invalid_quantities.any():
-            logger.warning(f"Found {invalid_quantities.sum()} rows with invalid quantities")
+        if invalid_quantities:
+            logger.warning(f"Found {invalid_quantities} rows with invalid quantities")
             
-        if invalid_prices.any():
-            logger.warning(f"Found {invalid_prices.sum()} rows with invalid prices")
+        if invalid_prices:
+            logger.warning(f"Found {invalid_prices} rows with invalid prices")
             
         # Check date range
         date_range = df['InvoiceDate'].max() - df['InvoiceDate'].min()
@@ -116,7 +126,7 @@ def format_error_message(error: Exception, context: str = None) -> str:
         error_message.insert(1, f"Context: {context}")
         
     error_message.append("Traceback:")
-    error_message.append(traceback.format_exc())
+    error_message.append("".join(traceback.format_exception(type(error), error, error.__traceback__)))
     
     return "\n".join(error_message)
 
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from data.data_processor import RetailDataProcessor
+
+
+def _sample_frame(n_rows: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """Small retail frame spanning a few months, with gaps and missing customers"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2011-01-03') + pd.to_timedelta(rng.integers(0, 120 * 24 * 60, n_rows), unit='min')
+    customers = rng.integers(12000, 12060, n_rows).astype(np.float64)
+    customers[rng.random(n_rows) < 0.1] = np.nan
+    df = pd.DataFrame({
+        'InvoiceNo': rng.integers(536000, 536400, n_rows).astype(str).astype(object),
+        'StockCode': rng.integers(10000, 10100, n_rows).astype(str).astype(object),
+        'Quantity': rng.integers(1, 50, n_rows).astype(np.int32),
+        'InvoiceDate': dates,
+        'UnitPrice': rng.uniform(0.5, 20, n_rows).round(2).astype(np.float32),
+        'CustomerID': customers
+    })
+    # Leave February empty so weeks and a month without rows are covered
+    return df[df['InvoiceDate'].dt.month != 2].reset_index(drop=True)
+
+
+def _expected_temporal_metrics(df: pd.DataFrame) -> dict:
+    """Reference result from plain groupbys, as the temporal metrics were first written"""
+    agg = {'TransactionValue': 'sum', 'InvoiceNo': 'nunique', 'CustomerID': 'nunique', 'Quantity': 'sum'}
+    return {
+        'daily': df.groupby(df['InvoiceDate'].dt.date).agg(agg).reset_index(),
+        'weekly': df.groupby(pd.Grouper(key='InvoiceDate', freq='W')).agg(agg).reset_index(),
+        'monthly': df.groupby(pd.Grouper(key='InvoiceDate', freq='M')).agg(agg).reset_index()
+    }
+
+
+def test_temporal_metrics_match_groupby_reference():
+    processor = RetailDataProcessor(_sample_frame())
+    processor.processed_data = processor.process_transactions()
+
+    result = processor.calculate_temporal_metrics()
+    expected = _expected_temporal_metrics(processor.processed_data)
+
+    assert result.keys() == expected.keys()
+    for period, frame in expected.items():
+        # Compares values, dtypes and labels, including date objects for the daily keys
+        pd.testing.assert_frame_equal(result[period], frame)
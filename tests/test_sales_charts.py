@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from components import sales_charts
+from data.frame_store import make_frame_id, write_frame
+
+
+def _sample_frame(n_rows: int = 3000, seed: int = 0) -> pd.DataFrame:
+    """Small filtered frame over a few weeks, with returns and missing customers"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2011-03-01') + pd.to_timedelta(rng.integers(0, 40 * 24 * 60, n_rows), unit='min')
+    customers = rng.integers(12000, 12080, n_rows).astype(np.float32)
+    customers[rng.random(n_rows) < 0.1] = np.nan
+    quantities = rng.integers(1, 50, n_rows).astype(np.int32)
+    quantities[rng.random(n_rows) < 0.05] *= -1
+    df = pd.DataFrame({
+        'InvoiceNo': rng.integers(536000, 536600, n_rows).astype(str).astype(object),
+        'Description': [f'PRODUCT {i}' for i in rng.integers(0, 40, n_rows)],
+        'Quantity': quantities,
+        'InvoiceDate': dates,
+        'UnitPrice': rng.uniform(0.5, 20, n_rows).round(2).astype(np.float32),
+        'CustomerID': customers
+    })
+    df['TotalAmount'] = df['Quantity'] * df['UnitPrice']
+    return df.sort_values('InvoiceDate', ignore_index=True)
+
+
+@pytest.mark.filterwarnings('error::pandas.errors.SettingWithCopyWarning')
+def test_dask_aggregation_matches_numpy_path(monkeypatch):
+    ref = write_frame(_sample_frame(), make_frame_id('test-sales-aggregation'))
+
+    daily_numpy, category_numpy = sales_charts._aggregate_sales.uncached(ref)
+    monkeypatch.setattr(sales_charts, 'DASK_ROW_THRESHOLD', 100)
+    daily_dask, category_dask = sales_charts._aggregate_sales.uncached(ref)
+
+    # Same index dtype and name, columns and dtypes; sums may differ in the last bits
+    pd.testing.assert_frame_equal(daily_dask, daily_numpy, check_exact=False, rtol=1e-6)
+    pd.testing.assert_frame_equal(category_dask, category_numpy, check_exact=False, rtol=1e-9)
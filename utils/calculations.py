@@ -1,40 +1,203 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from datetime import datetime, timedelta
+import importlib.util
 import logging
+import dask
+from scipy.sparse import csr_matrix
+
+from utils.date_helpers import get_date_parts
+from utils.grouping import count_distinct, grouped_nunique
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Optional GPU support: CuPy is imported only when a GPU correlation is run
+HAS_CUPY = importlib.util.find_spec('cupy') is not None
+
+# Invoice x product cells above which use_gpu='auto' moves the Gram product to the GPU
+GPU_CORRELATION_MIN_CELLS = 50_000_000
+
+def _quintile_bins(values: np.ndarray) -> np.ndarray:
+    """
+    Quintile bin (0-4) of each value, as pd.qcut(values, 5) would assign it
+    
+    One quantile pass and a searchsorted against the four inner edges, without
+    building the interval Categorical; bins are right-closed like qcut's.
+    """
+    edges = np.quantile(values, [0, 0.2, 0.4, 0.6, 0.8, 1])
+    if (np.diff(edges) == 0).any():
+        raise ValueError(f"Bin edges must be unique: {edges!r}.")
+    return np.searchsorted(edges[1:-1], values, side='left').astype(np.int8)
+
+def _first_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks with ties broken by position, as Series.rank(method='first')"""
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[np.argsort(values, kind='stable')] = np.arange(1, len(values) + 1)
+    return ranks
+
+def _invoice_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-invoice TotalAmount, Quantity and distinct Products, from one InvoiceNo grouping"""
+    grouped = df.groupby('InvoiceNo', sort=False, observed=True)
+    totals = grouped.agg(TotalAmount=('TotalAmount', 'sum'), Quantity=('Quantity', 'sum'))
+    totals['Products'] = grouped_nunique(grouped.ngroup().to_numpy(), df['StockCode'], len(totals))
+    return totals
+
+def _customer_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-customer Orders, first and last purchase, Items and Spend, from one CustomerID grouping"""
+    grouped = df.groupby('CustomerID', sort=False, observed=True)
+    totals = grouped.agg(
+        FirstPurchase=('InvoiceDate', 'min'),
+        LastPurchase=('InvoiceDate', 'max'),
+        Items=('Quantity', 'sum'),
+        Spend=('TotalAmount', 'sum')
+    )
+    totals['Orders'] = grouped_nunique(grouped.ngroup().to_numpy(), df['InvoiceNo'], len(totals))
+    return totals
+
+def _gram_matrix(counts: csr_matrix, use_gpu: bool) -> np.ndarray:
+    """Dense M.T @ M of a sparse count matrix, on the GPU when requested"""
+    if use_gpu:
+        import cupy
+        import cupyx.scipy.sparse
+        gpu_counts = cupyx.scipy.sparse.csr_matrix(counts)
+        return cupy.asnumpy((gpu_counts.T @ gpu_counts).toarray())
+    return (counts.T @ counts).toarray()
+
+def _purchase_correlation(df: pd.DataFrame, use_gpu: Union[bool, str] = 'auto') -> pd.DataFrame:
+    """
+    Pearson correlation between products' per-invoice purchase counts
+    
+    Equivalent to pd.crosstab(df['InvoiceNo'], df['StockCode']).corr(), but the
+    invoice x product counts are held as a sparse matrix and the correlations
+    come from its Gram matrix M.T @ M and column sums, instead of a dense
+    crosstab that is almost entirely zeros.
+    
+    Args:
+        df (pd.DataFrame): Transactions with InvoiceNo and StockCode
+        use_gpu (bool or 'auto'): Compute the Gram matrix with CuPy; 'auto' does
+            so when CuPy is installed and the matrix is large
+        
+    Returns:
+        pd.DataFrame: Product x product correlation matrix indexed by StockCode
+    """
+    keys = df[['InvoiceNo', 'StockCode']].dropna()
+    invoice_codes, invoices = pd.factorize(keys['InvoiceNo'])
+    product_codes, products = pd.factorize(keys['StockCode'], sort=True)
+    n_invoices = len(invoices)
+    
+    # Duplicate (invoice, product) entries are summed, giving crosstab's counts
+    counts = csr_matrix(
+        (np.ones(len(keys), dtype=np.float64), (invoice_codes, product_codes)),
+        shape=(n_invoices, len(products))
+    )
+    col_sums = np.asarray(counts.sum(axis=0)).ravel()
+    
+    if use_gpu == 'auto':
+        use_gpu = HAS_CUPY and n_invoices * len(products) >= GPU_CORRELATION_MIN_CELLS
+    elif use_gpu and not HAS_CUPY:
+        logger.warning("CuPy is not installed; computing product correlations on the CPU")
+        use_gpu = False
+    
+    # Covariance and variances up to the shared 1/(n-1) factor, which cancels
+    cov = _gram_matrix(counts, use_gpu)
+    cov -= np.outer(col_sums, col_sums / n_invoices)
+    std = np.sqrt(np.diag(cov).clip(min=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+    # Constant columns have no defined correlation, as in DataFrame.corr
+    corr[std == 0, :] = np.nan
+    corr[:, std == 0] = np.nan
+    np.clip(corr, -1, 1, out=corr)
+    
+    labels = pd.Index(np.asarray(products), name='StockCode')
+    return pd.DataFrame(corr, index=labels, columns=labels)
+
+# Columns the metric methods group on; see RetailCalculations.prepare_frame
+GROUP_KEY_COLUMNS = ('InvoiceNo', 'StockCode', 'Description', 'CustomerID')
+
+# RFM segment labels by code; the last one is the fallback when no rule matches
+SEGMENT_LABELS = ['Champions', 'Loyal Customers', 'Recent Customers', 'Regular Customers',
+                  'Big Spenders', 'Lost Customers']
+
+# Narrow dtypes for the summed columns, matching what the data loader produces;
+# TotalAmount stays float64 so revenue sums keep their pence
+VALUE_COLUMN_DTYPES = {'Quantity': np.int32}
+
 class RetailCalculations:
     """Class containing calculation methods for retail analytics"""
     
     @staticmethod
-    def calculate_revenue_metrics(df: pd.DataFrame) -> Dict[str, float]:
+    def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Cast the grouping key columns to categoricals once before computing metrics
+        
+        Groupbys on categorical keys bucket integer codes instead of hashing every
+        value again, so a frame prepared once makes each later metric call cheaper.
+        The cast itself costs about one hashing pass, so it pays off when several
+        metrics are computed from the same frame. Columns that are already
+        categorical are left untouched, and a wider Quantity column is narrowed
+        to int32.
+        
+        Args:
+            df (pd.DataFrame): Input DataFrame
+            
+        Returns:
+            pd.DataFrame: DataFrame with categorical InvoiceNo, StockCode, Description
+                and CustomerID
+        """
+        casts = {
+            col: 'category' for col in GROUP_KEY_COLUMNS
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+        }
+        casts.update({
+            col: dtype for col, dtype in VALUE_COLUMN_DTYPES.items()
+            if col in df.columns and df[col].dtype.itemsize > np.dtype(dtype).itemsize
+        })
+        return df.astype(casts) if casts else df
+    
+    @staticmethod
+    def calculate_revenue_metrics(df: pd.DataFrame,
+                                  per_invoice: Optional[pd.DataFrame] = None,
+                                  per_customer: Optional[pd.DataFrame] = None) -> Dict[str, float]:
         """
         Calculate key revenue metrics
         
         Args:
             df (pd.DataFrame): Input DataFrame
+            per_invoice (pd.DataFrame, optional): Precomputed invoice totals
+            per_customer (pd.DataFrame, optional): Precomputed customer totals
             
         Returns:
             Dict[str, float]: Dictionary of revenue metrics
         """
         try:
+            # One grouping per key; the group counts double as the distinct counts
+            # (groupby drops missing keys just as nunique does). Standalone calls
+            # only sum, rather than building the full shared totals
+            if per_invoice is not None:
+                order_revenue = per_invoice['TotalAmount']
+            else:
+                order_revenue = df.groupby('InvoiceNo', sort=False, observed=True)['TotalAmount'].sum()
+            if per_customer is not None:
+                customer_revenue = per_customer['Spend']
+            else:
+                customer_revenue = df.groupby('CustomerID', sort=False, observed=True)['TotalAmount'].sum()
+            
             metrics = {
                 'total_revenue': df['TotalAmount'].sum(),
-                'average_order_value': df.groupby('InvoiceNo')['TotalAmount'].sum().mean(),
-                'median_order_value': df.groupby('InvoiceNo')['TotalAmount'].sum().median(),
-                'revenue_per_customer': df.groupby('CustomerID')['TotalAmount'].sum().mean(),
-                'total_orders': df['InvoiceNo'].nunique(),
-                'total_customers': df['CustomerID'].nunique()
+                'average_order_value': order_revenue.mean(),
+                'median_order_value': order_revenue.median(),
+                'revenue_per_customer': customer_revenue.mean(),
+                'total_orders': len(order_revenue),
+                'total_customers': len(customer_revenue)
             }
             
             # Calculate growth metrics if data spans multiple periods
-            if len(df['InvoiceDate'].dt.to_period('M').unique()) > 1:
-                monthly_revenue = df.groupby(df['InvoiceDate'].dt.to_period('M'))['TotalAmount'].sum()
+            monthly_revenue = df.groupby(df['InvoiceDate'].dt.to_period('M'))['TotalAmount'].sum()
+            if len(monthly_revenue) > 1:
                 metrics['mom_growth'] = ((monthly_revenue.iloc[-1] / monthly_revenue.iloc[-2]) - 1) * 100
             
             return metrics
@@ -43,28 +206,30 @@ class RetailCalculations:
             raise
 
     @staticmethod
-    def calculate_customer_metrics(df: pd.DataFrame) -> Dict[str, float]:
+    def calculate_customer_metrics(df: pd.DataFrame,
+                                   per_customer: Optional[pd.DataFrame] = None) -> Dict[str, float]:
         """
         Calculate customer-related metrics
         
         Args:
             df (pd.DataFrame): Input DataFrame
+            per_customer (pd.DataFrame, optional): Precomputed customer totals
             
         Returns:
             Dict[str, float]: Dictionary of customer metrics
         """
         try:
             # Customer purchase frequency
-            customer_orders = df.groupby('CustomerID')['InvoiceNo'].nunique()
-            customer_first_purchase = df.groupby('CustomerID')['InvoiceDate'].min()
-            customer_last_purchase = df.groupby('CustomerID')['InvoiceDate'].max()
-            customer_lifespan = (customer_last_purchase - customer_first_purchase).dt.days
+            if per_customer is None:
+                per_customer = _customer_totals(df)
+            customer_orders = per_customer['Orders']
+            customer_lifespan = (per_customer['LastPurchase'] - per_customer['FirstPurchase']).dt.days
 
             metrics = {
                 'avg_purchase_frequency': customer_orders.mean(),
                 'median_purchase_frequency': customer_orders.median(),
                 'avg_customer_lifespan': customer_lifespan.mean(),
-                'avg_items_per_customer': df.groupby('CustomerID')['Quantity'].sum().mean(),
+                'avg_items_per_customer': per_customer['Items'].mean(),
                 'customer_retention_rate': (len(customer_orders[customer_orders > 1]) / 
                                          len(customer_orders) * 100)
             }
@@ -75,39 +240,45 @@ class RetailCalculations:
             raise
 
     @staticmethod
-    def calculate_product_metrics(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    def calculate_product_metrics(df: pd.DataFrame, use_gpu: Union[bool, str] = 'auto') -> Dict[str, pd.DataFrame]:
         """
         Calculate product performance metrics
         
         Args:
             df (pd.DataFrame): Input DataFrame
+            use_gpu (bool or 'auto'): Run the product correlation on the GPU via
+                CuPy; 'auto' does so for large matrices when CuPy is installed
             
         Returns:
             Dict[str, pd.DataFrame]: Dictionary of product metric DataFrames
         """
         try:
-            # Product performance
-            product_metrics = df.groupby(['StockCode', 'Description']).agg({
+            # Product performance: numeric aggregates only, so every column
+            # takes the Cython fast path
+            grouped = df.groupby(['StockCode', 'Description'], observed=True)
+            product_metrics = grouped.agg({
                 'Quantity': ['sum', 'mean'],
-                'TotalAmount': 'sum',
-                'CustomerID': 'nunique',
-                'InvoiceNo': 'nunique'
-            }).reset_index()
+                'TotalAmount': 'sum'
+            })
+            product_metrics.columns = ['TotalQuantity', 'AvgQuantity', 'TotalRevenue']
 
-            # Flatten column names
-            product_metrics.columns = ['StockCode', 'Description', 'TotalQuantity', 
-                                     'AvgQuantity', 'TotalRevenue', 'UniqueCustomers',
-                                     'TransactionCount']
+            # Distinct counts per product from packed (product, value) code pairs
+            group_codes = grouped.ngroup().to_numpy()
+            n_products = len(product_metrics)
+            product_metrics['UniqueCustomers'] = grouped_nunique(group_codes, df['CustomerID'], n_products)
+            product_metrics['TransactionCount'] = grouped_nunique(group_codes, df['InvoiceNo'], n_products)
 
-            # Calculate additional metrics
+            # Calculate additional metrics on the indexed frame; the keys become
+            # columns once, at the end
             product_metrics['RevenuePerTransaction'] = (product_metrics['TotalRevenue'] / 
                                                       product_metrics['TransactionCount'])
+            # On a prepared frame the categorical codes give this without hashing
             product_metrics['CustomerPenetration'] = (product_metrics['UniqueCustomers'] / 
-                                                    df['CustomerID'].nunique() * 100)
+                                                    count_distinct(df['CustomerID']) * 100)
+            product_metrics = product_metrics.reset_index()
 
             # Product correlations
-            purchase_matrix = pd.crosstab(df['InvoiceNo'], df['StockCode'])
-            correlation_matrix = purchase_matrix.corr()
+            correlation_matrix = _purchase_correlation(df, use_gpu)
 
             return {
                 'product_metrics': product_metrics,
@@ -134,40 +305,41 @@ class RetailCalculations:
                 reference_date = df['InvoiceDate'].max()
 
             # Calculate RFM metrics
-            rfm = df.groupby('CustomerID').agg({
-                'InvoiceDate': lambda x: (reference_date - x.max()).days,  # Recency
-                'InvoiceNo': 'nunique',                                    # Frequency
-                'TotalAmount': 'sum'                                       # Monetary
+            rfm = df.groupby('CustomerID', observed=True).agg({
+                'InvoiceDate': 'max',        # Last purchase, turned into Recency below
+                'InvoiceNo': 'nunique',      # Frequency
+                'TotalAmount': 'sum'         # Monetary
             }).reset_index()
 
             rfm.columns = ['CustomerID', 'Recency', 'Frequency', 'Monetary']
+            # Days since the last purchase, in one vectorized subtraction over all customers
+            rfm['Recency'] = (reference_date - rfm['Recency']).dt.days
+
+            # Calculate RFM scores as quintiles; a lower recency scores higher
+            r = 5 - _quintile_bins(rfm['Recency'].to_numpy())
+            f = _quintile_bins(_first_ranks(rfm['Frequency'].to_numpy())) + 1
+            m = _quintile_bins(_first_ranks(rfm['Monetary'].to_numpy())) + 1
+            rfm['R_Score'] = r
+            rfm['F_Score'] = f
+            rfm['M_Score'] = m
 
-            # Calculate RFM scores
-            rfm['R_Score'] = pd.qcut(rfm['Recency'], q=5, labels=[5, 4, 3, 2, 1])
-            rfm['F_Score'] = pd.qcut(rfm['Frequency'].rank(method='first'), q=5, labels=[1, 2, 3, 4, 5])
-            rfm['M_Score'] = pd.qcut(rfm['Monetary'].rank(method='first'), q=5, labels=[1, 2, 3, 4, 5])
-
-            # Calculate RFM Score and Segment
-            rfm['RFM_Score'] = (rfm['R_Score'].astype(str) + 
-                              rfm['F_Score'].astype(str) + 
-                              rfm['M_Score'].astype(str))
-
-            def get_segment(row):
-                r, f, m = row['R_Score'], row['F_Score'], row['M_Score']
-                if r >= 4 and f >= 4 and m >= 4:
-                    return 'Champions'
-                elif r >= 3 and f >= 3 and m >= 3:
-                    return 'Loyal Customers'
-                elif r >= 3:
-                    return 'Recent Customers'
-                elif f >= 3:
-                    return 'Regular Customers'
-                elif m >= 3:
-                    return 'Big Spenders'
-                else:
-                    return 'Lost Customers'
-
-            rfm['Customer_Segment'] = rfm.apply(get_segment, axis=1)
+            # Calculate RFM Score as the three digits packed into one int16 (R=5, F=4, M=3 -> 543)
+            rfm['RFM_Score'] = r.astype(np.int16) * 100 + f * 10 + m
+
+            # Segment on whole-column score masks; the first matching rule wins.
+            # The rules pick int8 codes into SEGMENT_LABELS, kept as a categorical
+            segment_codes = np.select(
+                [
+                    (r >= 4) & (f >= 4) & (m >= 4),
+                    (r >= 3) & (f >= 3) & (m >= 3),
+                    r >= 3,
+                    f >= 3,
+                    m >= 3
+                ],
+                np.arange(len(SEGMENT_LABELS) - 1, dtype=np.int8),
+                default=np.int8(len(SEGMENT_LABELS) - 1)
+            )
+            rfm['Customer_Segment'] = pd.Categorical.from_codes(segment_codes, SEGMENT_LABELS)
             
             return rfm
         except Exception as e:
@@ -186,8 +358,8 @@ class RetailCalculations:
             Dict[str, pd.DataFrame]: Dictionary of time-based metric DataFrames
         """
         try:
-            # Daily metrics
-            daily_metrics = df.groupby(df['InvoiceDate'].dt.date).agg({
+            # Daily metrics, keyed on datetime64 days (int64 hashing) rather than date objects
+            daily_metrics = df.groupby(df['InvoiceDate'].dt.floor('D')).agg({
                 'TotalAmount': 'sum',
                 'InvoiceNo': 'nunique',
                 'CustomerID': 'nunique',
@@ -195,19 +367,28 @@ class RetailCalculations:
             }).reset_index()
 
             # Calculate moving averages
-            daily_metrics['Revenue_MA7'] = daily_metrics['TotalAmount'].rolling(window=7).mean()
-            daily_metrics['Orders_MA7'] = daily_metrics['InvoiceNo'].rolling(window=7).mean()
+            # One rolling window over both columns rather than one per column
+            daily_metrics[['Revenue_MA7', 'Orders_MA7']] = (
+                daily_metrics[['TotalAmount', 'InvoiceNo']].rolling(window=7).mean().to_numpy()
+            )
+
+            # Calendar keys split from the timestamps in one pass; named so the
+            # reset_index below yields distinct columns
+            date_parts = {
+                name: pd.Series(values, index=df.index, name=name)
+                for name, values in get_date_parts(df['InvoiceDate']).items()
+            }
 
             # Hourly patterns
-            hourly_metrics = df.groupby([df['InvoiceDate'].dt.dayofweek, 
-                                       df['InvoiceDate'].dt.hour]).agg({
+            hourly_metrics = df.groupby([date_parts['DayOfWeek'], 
+                                       date_parts['Hour']]).agg({
                 'TotalAmount': ['sum', 'mean'],
                 'InvoiceNo': 'nunique'
             }).reset_index()
 
             # Seasonal patterns
-            seasonal_metrics = df.groupby([df['InvoiceDate'].dt.month, 
-                                         df['InvoiceDate'].dt.day]).agg({
+            seasonal_metrics = df.groupby([date_parts['Month'], 
+                                         date_parts['Day']]).agg({
                 'TotalAmount': ['sum', 'mean'],
                 'InvoiceNo': 'nunique'
             }).reset_index()
@@ -222,27 +403,25 @@ class RetailCalculations:
             raise
 
     @staticmethod
-    def calculate_basket_metrics(df: pd.DataFrame) -> Dict[str, float]:
+    def calculate_basket_metrics(df: pd.DataFrame,
+                                 per_invoice: Optional[pd.DataFrame] = None) -> Dict[str, float]:
         """
         Calculate basket analysis metrics
         
         Args:
             df (pd.DataFrame): Input DataFrame
+            per_invoice (pd.DataFrame, optional): Precomputed invoice totals
             
         Returns:
             Dict[str, float]: Dictionary of basket metrics
         """
         try:
             # Calculate basket-level metrics
-            basket_sizes = df.groupby('InvoiceNo').agg({
-                'StockCode': 'nunique',
-                'Quantity': 'sum',
-                'TotalAmount': 'sum'
-            })
+            basket_sizes = _invoice_totals(df) if per_invoice is None else per_invoice
 
             metrics = {
-                'avg_basket_size': basket_sizes['StockCode'].mean(),
-                'median_basket_size': basket_sizes['StockCode'].median(),
+                'avg_basket_size': basket_sizes['Products'].mean(),
+                'median_basket_size': basket_sizes['Products'].median(),
                 'avg_basket_value': basket_sizes['TotalAmount'].mean(),
                 'median_basket_value': basket_sizes['TotalAmount'].median(),
                 'avg_items_per_basket': basket_sizes['Quantity'].mean(),
@@ -254,6 +433,60 @@ class RetailCalculations:
             logger.error(f"Error calculating basket metrics: {str(e)}")
             raise
 
+    @staticmethod
+    def calculate_summary_metrics(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate the revenue, customer and basket metrics from shared groupings
+        
+        The three metric groups all project from the same per-invoice and
+        per-customer totals, so computing them together groups df once per key
+        instead of once per method.
+        
+        Args:
+            df (pd.DataFrame): Input DataFrame
+            
+        Returns:
+            Dict[str, Dict[str, float]]: Metrics keyed by group ('revenue', 'customer', 'basket')
+        """
+        per_invoice = _invoice_totals(df)
+        per_customer = _customer_totals(df)
+        return {
+            'revenue': RetailCalculations.calculate_revenue_metrics(df, per_invoice, per_customer),
+            'customer': RetailCalculations.calculate_customer_metrics(df, per_customer),
+            'basket': RetailCalculations.calculate_basket_metrics(df, per_invoice)
+        }
+
+    @staticmethod
+    def calculate_all_metrics(df: pd.DataFrame, scheduler: str = 'threads') -> Dict[str, object]:
+        """
+        Compute every metric group concurrently in one Dask graph
+        
+        The metric methods only read df, so each one becomes an independent
+        delayed task. The threaded scheduler shares df between tasks without
+        copying it, and the groupby kernels release the GIL while they run.
+        
+        Args:
+            df (pd.DataFrame): Input DataFrame, ideally from prepare_frame
+            scheduler (str): Dask scheduler; 'sync' runs the tasks serially
+            
+        Returns:
+            Dict[str, object]: Results keyed by metric group ('revenue', 'customer',
+                'product', 'rfm', 'time', 'basket')
+        """
+        tasks = {
+            'summary': RetailCalculations.calculate_summary_metrics,
+            'product': RetailCalculations.calculate_product_metrics,
+            'rfm': RetailCalculations.calculate_rfm_metrics,
+            'time': RetailCalculations.calculate_time_based_metrics
+        }
+        results = dict(zip(tasks, dask.compute(
+            *(dask.delayed(func)(df) for func in tasks.values()),
+            scheduler=scheduler
+        )))
+        # The shared-grouping groups are returned alongside the others
+        results.update(results.pop('summary'))
+        return results
+
 # Example usage
 if __name__ == "__main__":
     from ..data.data_loader import RetailDataLoader
@@ -266,24 +499,28 @@ if __name__ == "__main__":
         # Clean and prepare data
         df = df[df['Quantity'] > 0]  # Remove cancelled orders
         df['TotalAmount'] = df['Quantity'] * df['UnitPrice']
+        df = RetailCalculations.prepare_frame(df)
+        
+        # Calculate all metric groups concurrently
+        metrics = RetailCalculations.calculate_all_metrics(df)
         
-        # Calculate various metrics
         print("\nRevenue Metrics:")
-        revenue_metrics = RetailCalculations.calculate_revenue_metrics(df)
+        revenue_metrics = metrics['revenue']
         for metric, value in revenue_metrics.items():
             print(f"{metric}: {value:,.2f}")
             
         print("\nCustomer Metrics:")
-        customer_metrics = RetailCalculations.calculate_customer_metrics(df)
+        customer_metrics = metrics['customer']
         for metric, value in customer_metrics.items():
             print(f"{metric}: {value:,.2f}")
             
         print("\nBasket Metrics:")
-        basket_metrics = RetailCalculations.calculate_basket_metrics(df)
+        basket_metrics = metrics['basket']
         for metric, value in basket_metrics.items():
             print(f"{metric}: {value:,.2f}")
             
         # Calculate RFM metrics
-        rfm_metrics = RetailCalculations.calculate_rfm_metrics(df)
+        rfm_metrics = metrics['rfm']
         print("\nCustomer Segments Distribution:")
-        print(rfm_metrics['Customer_Segment'].value_counts())
\ No newline at end of file
+        segment_counts = np.bincount(rfm_metrics['Customer_Segment'].cat.codes, minlength=len(SEGMENT_LABELS))
+        print(pd.Series(segment_counts, index=SEGMENT_LABELS, name='count'))
\ No newline at end of file
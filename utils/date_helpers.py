@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 import calendar
@@ -121,6 +122,9 @@ def get_week_dates(date: datetime) -> Tuple[datetime, datetime]:
     end_date = start_date + timedelta(days=6)
     return start_date, end_date
 
+# Period length in days for the fixed-length create_date_ranges frequencies
+FIXED_PERIOD_DAYS = {'D': 1, 'W': 7}
+
 def create_date_ranges(start_date: datetime, end_date: datetime, freq: str) -> List[Tuple[datetime, datetime]]:
     """
     Create a list of date ranges between start and end dates
@@ -133,6 +137,19 @@ def create_date_ranges(start_date: datetime, end_date: datetime, freq: str) -> L
     Returns:
         List[Tuple[datetime, datetime]]: List of date ranges
     """
+    if freq in FIXED_PERIOD_DAYS and type(start_date) is datetime and start_date.tzinfo is None:
+        # Fixed-length periods: every boundary from one numpy arange instead of
+        # a Python loop step per period (calendar steps below keep relativedelta)
+        if start_date >= end_date:
+            return []
+        edges = np.arange(
+            np.datetime64(start_date, 'us'),
+            np.datetime64(end_date, 'us'),
+            np.timedelta64(FIXED_PERIOD_DAYS[freq], 'D')
+        ).astype(object).tolist()
+        edges.append(end_date)
+        return list(zip(edges[:-1], edges[1:]))
+    
     ranges = []
     current_date = start_date
     
@@ -155,6 +172,9 @@ def create_date_ranges(start_date: datetime, end_date: datetime, freq: str) -> L
         
     return ranges
 
+# Full month names ('%B') indexed by month number, resolved once at import
+MONTH_NAMES = tuple(calendar.month_name)
+
 def format_date_range(start_date: datetime, end_date: datetime) -> str:
     """
     Format a date range as a string
@@ -166,13 +186,15 @@ def format_date_range(start_date: datetime, end_date: datetime) -> str:
     Returns:
         str: Formatted date range string
     """
+    # Plain f-string fields instead of strftime, which re-parses its format on every call
+    start = f"{MONTH_NAMES[start_date.month]} {start_date.day:02d}"
     if start_date.year == end_date.year:
         if start_date.month == end_date.month:
             if start_date.day == end_date.day:
-                return start_date.strftime('%B %d, %Y')
-            return f"{start_date.strftime('%B %d')} - {end_date.strftime('%d, %Y')}"
-        return f"{start_date.strftime('%B %d')} - {end_date.strftime('%B %d, %Y')}"
-    return f"{start_date.strftime('%B %d, %Y')} - {end_date.strftime('%B %d, %Y')}"
+                return f"{start}, {start_date.year}"
+            return f"{start} - {end_date.day:02d}, {end_date.year}"
+        return f"{start} - {MONTH_NAMES[end_date.month]} {end_date.day:02d}, {end_date.year}"
+    return f"{start}, {start_date.year} - {MONTH_NAMES[end_date.month]} {end_date.day:02d}, {end_date.year}"
 
 def get_relative_dates(reference_date: datetime = None) -> dict:
     """
@@ -186,19 +208,62 @@ def get_relative_dates(reference_date: datetime = None) -> dict:
     """
     if reference_date is None:
         reference_date = datetime.now()
+    
+    # Derive every range from one start-of-day value with plain timedelta arithmetic
+    today_start = reference_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    one_day = timedelta(days=1)
         
     return {
-        'today': (reference_date.replace(hour=0, minute=0, second=0, microsecond=0),
-                 reference_date.replace(hour=23, minute=59, second=59, microsecond=999999)),
-        'yesterday': get_last_n_days(1, reference_date.replace(hour=0, minute=0, second=0, microsecond=0)),
-        'last_7_days': get_last_n_days(7, reference_date),
-        'last_30_days': get_last_n_days(30, reference_date),
-        'last_90_days': get_last_n_days(90, reference_date),
+        'today': (today_start, today_start + one_day - timedelta(microseconds=1)),
+        'yesterday': (today_start - one_day, today_start),
+        'last_7_days': (reference_date - timedelta(days=7), reference_date),
+        'last_30_days': (reference_date - timedelta(days=30), reference_date),
+        'last_90_days': (reference_date - timedelta(days=90), reference_date),
         'last_month': get_last_n_months(1, reference_date),
         'last_quarter': get_last_n_months(3, reference_date),
         'ytd': get_year_to_date(reference_date.year)
     }
 
+def get_date_parts(dates: pd.Series) -> Dict[str, np.ndarray]:
+    """
+    Split timestamps into calendar fields in one pass over the int64 values
+    
+    Equivalent to the .dt.year/.month/.day/.dayofweek/.hour accessors, but the
+    timestamps are truncated to days once and each field is integer arithmetic
+    on that, rather than every accessor decoding the full timestamps again.
+    
+    Args:
+        dates (pd.Series): Timezone-naive datetime64 Series
+        
+    Returns:
+        Dict[str, np.ndarray]: int32 arrays keyed 'Year', 'Month', 'Day', 'DayOfWeek'
+            (Monday=0) and 'Hour'
+    """
+    if dates.dt.tz is not None or dates.isna().any():
+        # Missing or timezone-aware timestamps keep the accessor semantics
+        return {
+            'Year': dates.dt.year.to_numpy(),
+            'Month': dates.dt.month.to_numpy(),
+            'Day': dates.dt.day.to_numpy(),
+            'DayOfWeek': dates.dt.dayofweek.to_numpy(),
+            'Hour': dates.dt.hour.to_numpy()
+        }
+    
+    values = dates.to_numpy(dtype='datetime64[ns]')
+    days = values.astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    years = months.astype('datetime64[Y]')
+    day_numbers = days.astype(np.int64)
+    
+    return {
+        'Year': (years.astype(np.int64) + 1970).astype(np.int32),
+        'Month': ((months - years).astype(np.int64) + 1).astype(np.int32),
+        'Day': ((days - months).astype(np.int64) + 1).astype(np.int32),
+        # 1970-01-01 was a Thursday (dayofweek 3)
+        'DayOfWeek': ((day_numbers + 3) % 7).astype(np.int32),
+        'Hour': ((values - days) // np.timedelta64(1, 'h')).astype(np.int32)
+    }
+
 # Example usage
 if __name__ == "__main__":
     from ..data.data_loader import RetailDataLoader
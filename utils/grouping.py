@@ -0,0 +1,40 @@
+from typing import Union
+import numpy as np
+import pandas as pd
+
+def grouped_nunique(group_codes: np.ndarray, values: Union[np.ndarray, pd.Series], n_groups: int) -> np.ndarray:
+    """
+    Count distinct values per group without building a Python set per group
+    
+    Values are factorized to int codes, each (group, value) pair is packed
+    into one int64 and de-duplicated with a single hash pass, and the
+    surviving pairs are counted per group with bincount.
+    
+    Args:
+        group_codes (np.ndarray): Group code per row, in [0, n_groups); rows
+            coded -1 (e.g. a missing groupby key) are ignored
+        values (np.ndarray or pd.Series): Values to count; missing values are ignored
+        n_groups (int): Number of groups
+        
+    Returns:
+        np.ndarray: Distinct value count per group
+    """
+    value_codes, uniques = pd.factorize(values)
+    valid = (group_codes >= 0) & (value_codes >= 0)
+    n_values = max(len(uniques), 1)
+    pairs = pd.unique(group_codes[valid].astype(np.int64) * n_values + value_codes[valid])
+    return np.bincount(pairs // n_values, minlength=n_groups)
+
+def count_distinct(values: pd.Series) -> int:
+    """
+    Count distinct non-null values, marking categorical codes in a bitmap
+    
+    A categorical column already holds every label once, so its codes index
+    straight into a seen-flag array instead of being hashed again.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        seen = np.zeros(len(values.cat.categories), dtype=bool)
+        seen[codes[codes >= 0]] = True
+        return int(np.count_nonzero(seen))
+    return int(values.nunique())